@@ -0,0 +1,291 @@
+"""Multi-resolution pyramid of native IMERG precipitation.
+
+Every level in ``PYRAMID_RESOLUTIONS`` is block-summed (``coarsen``) from
+the coarsest finer level whose cells it is made of, so coarse levels never
+re-read the native record; a level that nests in no finer one (e.g. the
+first, from native IMERG) is mapped through conservative overlap matrices.
+Level grids have edges snapped to multiples of their resolution around the
+configured domain. Cell areas are exact on the sphere
+(``dlon * (sin(lat_n) - sin(lat_s))``, i.e. integrated cos-lat).
+
+Each level carries the area of every cell that native data actually
+covers and uses it, not the full cell area, as the weight for the levels
+built from it. Every level therefore equals direct area averaging of the
+native data, including partly covered cells on the domain edge, and the
+domain area mean is the same at every level.
+
+All levels are built in one streaming pass over time blocks of the mm/day
+store and appended to ``IMERG_PYRAMID_FILE``, one NetCDF group per level,
+so a monthly update only builds the new months.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+import xarray as xr
+
+from src.chunk_planner import plan_reads, read_header
+from src.config import (
+    IMERG_MM_DAY_FILE,
+    IMERG_PYRAMID_FILE,
+    LAT_MAX,
+    LAT_MIN,
+    LON_MAX,
+    LON_MIN,
+    PYRAMID_RESOLUTIONS,
+)
+from src.region_mask import cell_edges
+from src.timeseries_store import (
+    append_to_store,
+    domain_signature,
+    month_keys,
+    pending_months,
+    select_months,
+)
+
+EDGE_TOL = 1e-6
+
+
+@dataclass(frozen=True)
+class LevelGrid:
+    """Cell edges (degrees) of one pyramid level."""
+
+    resolution: float
+    lat_edges: np.ndarray
+    lon_edges: np.ndarray
+
+    @property
+    def lat(self) -> np.ndarray:
+        return 0.5 * (self.lat_edges[1:] + self.lat_edges[:-1])
+
+    @property
+    def lon(self) -> np.ndarray:
+        return 0.5 * (self.lon_edges[1:] + self.lon_edges[:-1])
+
+    @property
+    def group(self) -> str:
+        return "res_" + f"{self.resolution:g}".replace(".", "p")
+
+    def cell_area(self) -> np.ndarray:
+        """Relative cell areas, ``(lat, lon)``."""
+        return np.outer(_lat_extent(self.lat_edges), np.diff(self.lon_edges))
+
+
+def _lat_extent(edges: np.ndarray) -> np.ndarray:
+    return np.diff(np.sin(np.deg2rad(edges)))
+
+
+def _snapped_edges(lo: float, hi: float, resolution: float) -> np.ndarray:
+    start = math.floor(lo / resolution + EDGE_TOL)
+    stop = math.ceil(hi / resolution - EDGE_TOL)
+    return np.arange(start, stop + 1) * resolution
+
+
+def level_grid(
+    resolution: float,
+    *,
+    lat_bounds: Tuple[float, float] = (LAT_MIN, LAT_MAX),
+    lon_bounds: Tuple[float, float] = (LON_MIN, LON_MAX),
+) -> LevelGrid:
+    """Grid covering the domain with edges on multiples of ``resolution``."""
+    return LevelGrid(
+        resolution=float(resolution),
+        lat_edges=_snapped_edges(*lat_bounds, resolution),
+        lon_edges=_snapped_edges(*lon_bounds, resolution),
+    )
+
+
+def native_grid(lat, lon) -> LevelGrid:
+    """Level describing a source grid from its cell centres."""
+    lat = np.asarray(lat, dtype=np.float64)
+    return LevelGrid(
+        resolution=float(abs(lat[1] - lat[0])),
+        lat_edges=cell_edges(lat),
+        lon_edges=cell_edges(lon),
+    )
+
+
+def overlap_matrix(src_edges: np.ndarray, dst_edges: np.ndarray) -> np.ndarray:
+    """``(n_dst, n_src)`` length of overlap between destination and source cells."""
+    lo = np.maximum(dst_edges[:-1, None], src_edges[None, :-1])
+    hi = np.minimum(dst_edges[1:, None], src_edges[None, 1:])
+    return np.clip(hi - lo, 0.0, None)
+
+
+def block_alignment(src_edges: np.ndarray, dst_edges: np.ndarray) -> Tuple[int, int] | None:
+    """Return ``(factor, offset)`` when every destination cell is exactly
+    ``factor`` consecutive source cells starting at ``src_edges[offset]``."""
+    factor = (dst_edges[1] - dst_edges[0]) / (src_edges[1] - src_edges[0])
+    if abs(factor - round(factor)) > EDGE_TOL or round(factor) < 1:
+        return None
+    factor = int(round(factor))
+    offset = int(np.argmin(np.abs(src_edges - dst_edges[0])))
+    picked = src_edges[offset::factor][: dst_edges.size]
+    if picked.size != dst_edges.size or not np.allclose(picked, dst_edges, atol=EDGE_TOL):
+        return None
+    return factor, offset
+
+
+def coarsen_level(
+    data: np.ndarray,
+    src: LevelGrid,
+    dst: LevelGrid,
+    covered: np.ndarray | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Area-weighted mean of a ``(time, lat, lon)`` block on the ``dst`` grid.
+
+    ``covered`` is the area of each source cell that holds data (default:
+    the full cell where ``data`` is finite). Returns the means and the
+    covered area of each destination cell, which is the ``covered`` input
+    for the next level. Cells without covered area are NaN.
+    """
+    if covered is None:
+        covered = np.where(np.isfinite(data), src.cell_area(), 0.0)
+    values = np.where(covered > 0, data, 0.0) * covered
+    lat_align = block_alignment(src.lat_edges, dst.lat_edges)
+    lon_align = block_alignment(src.lon_edges, dst.lon_edges)
+
+    if lat_align and lon_align:
+        (fy, oy), (fx, ox) = lat_align, lon_align
+        ny, nx = dst.lat.size, dst.lon.size
+        window = (slice(None), slice(oy, oy + fy * ny), slice(ox, ox + fx * nx))
+        shape = (data.shape[0], ny, fy, nx, fx)
+        num = values[window].reshape(shape).sum(axis=(2, 4))
+        den = covered[window].reshape(shape).sum(axis=(2, 4))
+    else:
+        # Covered area is assumed spread evenly over its source cell.
+        wlat = overlap_matrix(np.sin(np.deg2rad(src.lat_edges)), np.sin(np.deg2rad(dst.lat_edges)))
+        wlon = overlap_matrix(src.lon_edges, dst.lon_edges)
+        area = src.cell_area()
+        num = wlat @ (values / area) @ wlon.T
+        den = wlat @ (covered / area) @ wlon.T
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / den, np.nan), den
+
+
+def coverage(src: LevelGrid, dst: LevelGrid) -> np.ndarray:
+    """Fraction of each ``dst`` cell covered by the ``src`` grid."""
+    wlat = overlap_matrix(np.sin(np.deg2rad(src.lat_edges)), np.sin(np.deg2rad(dst.lat_edges)))
+    wlon = overlap_matrix(src.lon_edges, dst.lon_edges)
+    return np.outer(wlat.sum(axis=1), wlon.sum(axis=1)) / dst.cell_area()
+
+
+def nesting_parent(level: LevelGrid, finer: List[LevelGrid]) -> int | None:
+    """Index of the coarsest of ``finer`` that ``level`` block-aligns with."""
+    for i in reversed(range(len(finer))):
+        if block_alignment(finer[i].lat_edges, level.lat_edges) and block_alignment(
+            finer[i].lon_edges, level.lon_edges
+        ):
+            return i
+    return None
+
+
+def build_levels(
+    blocks,
+    native: LevelGrid,
+    resolutions=PYRAMID_RESOLUTIONS,
+) -> Tuple[List[LevelGrid], List[np.ndarray]]:
+    """Coarsen an iterable of native ``(time, lat, lon)`` blocks through
+    every level, returning the level grids and their stacked data.
+
+    Each level is block-summed from the coarsest finer level it nests in,
+    or mapped from native data when it nests in none.
+    """
+    levels = [level_grid(r) for r in sorted(resolutions)]
+    parents = [nesting_parent(level, levels[:i]) for i, level in enumerate(levels)]
+    outputs: List[List[np.ndarray]] = [[] for _ in levels]
+    for block in blocks:
+        block = np.asarray(block, dtype=np.float64)
+        # (means, covered area) per level, reused by the levels nested in it.
+        results = []
+        for level, parent, out in zip(levels, parents, outputs):
+            if parent is None:
+                results.append(coarsen_level(block, native, level))
+            else:
+                data, covered = results[parent]
+                results.append(coarsen_level(data, levels[parent], level, covered))
+            out.append(results[-1][0])
+    return levels, [np.concatenate(out, axis=0) for out in outputs]
+
+
+def pyramid_signature(resolutions=PYRAMID_RESOLUTIONS) -> str:
+    # ``weights`` marks stores built with covered-area weights; older
+    # stores are rebuilt.
+    levels = ",".join(f"{r:g}" for r in sorted(resolutions))
+    return f"{domain_signature()};levels={levels};weights=covered"
+
+
+def plan_pyramid_update(months, levels: List[LevelGrid]) -> Dict[str, List[str]]:
+    """Pending months per level group; rebuilds the file if any group must be."""
+    signature = pyramid_signature()
+    pending = {}
+    for level in levels:
+        months_todo, rebuild = pending_months(IMERG_PYRAMID_FILE, months, signature, level.group)
+        if rebuild:
+            print(f"Rebuilding store: {IMERG_PYRAMID_FILE}")
+            IMERG_PYRAMID_FILE.unlink()
+            return {level.group: sorted(set(months)) for level in levels}
+        pending[level.group] = months_todo
+    return pending
+
+
+def main():
+    header, _ = read_header(IMERG_MM_DAY_FILE, "precip_mm_day")
+    plan = plan_reads("build_pyramid", header, splittable=("time",))
+    ds = xr.open_dataset(IMERG_MM_DAY_FILE, chunks=plan.chunks)
+    da = ds["precip_mm_day"].transpose("time", "lat", "lon").sortby("lat").sortby("lon")
+    native = native_grid(da["lat"].values, da["lon"].values)
+
+    # Levels are appended per group, so only months missing from a group
+    # are built; a run interrupted between groups resumes where it stopped.
+    levels = [level_grid(r) for r in sorted(PYRAMID_RESOLUTIONS)]
+    pending = plan_pyramid_update(month_keys(da["time"].values), levels)
+    todo = sorted(set().union(*pending.values()))
+    if not todo:
+        print("Up to date:", IMERG_PYRAMID_FILE)
+        return
+    da = select_months(da, todo)
+
+    block = plan.chunks["time"]
+    blocks = (
+        da.isel(time=slice(start, start + block)).values
+        for start in range(0, da.sizes["time"], block)
+    )
+    with plan.scheduler():
+        levels, outputs = build_levels(blocks, native)
+
+    for level, data in zip(levels, outputs):
+        keep = np.isin(month_keys(da["time"].values), pending[level.group])
+        out = xr.Dataset(
+            {
+                "precip_mm_day": (
+                    ("time", "latitude", "longitude"),
+                    data[keep].astype(np.float32),
+                    {"units": "mm/day"},
+                ),
+                "coverage": (
+                    ("latitude", "longitude"),
+                    coverage(native, level),
+                    {"description": "fraction of the cell covered by native IMERG"},
+                ),
+            },
+            coords={
+                "time": da["time"].values[keep],
+                "latitude": level.lat,
+                "longitude": level.lon,
+            },
+            attrs={"resolution_deg": level.resolution},
+        )
+        append_to_store(out, IMERG_PYRAMID_FILE, pyramid_signature(), group=level.group)
+        print(f"{level.group}: {level.lat.size}x{level.lon.size} cells, {int(keep.sum())} months appended")
+
+    print("Saved:", IMERG_PYRAMID_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Build download URL lists by crawling provider directory listings.
+
+Each listing is cached locally together with its ``ETag`` and
+``Last-Modified`` validators, so re-crawling an unchanged index costs a
+single conditional request answered with ``304 Not Modified``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+from urllib.parse import urljoin, urlparse
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+
+from src.config import CATALOGUE_CACHE_DIR, END_DATE, START_DATE
+
+
+@dataclass(frozen=True)
+class CatalogueSpec:
+    """Where a product's monthly files live and how they are named.
+
+    ``file_pattern`` must define ``year`` and ``month`` named groups. Files
+    are expected under one sub-directory per year below ``base_url``.
+    """
+
+    base_url: str
+    file_pattern: str
+
+
+IMERG_CATALOGUE = CatalogueSpec(
+    base_url="https://gpm1.gesdisc.eosdis.nasa.gov/data/GPM_L3/GPM_3IMERGM.07/",
+    file_pattern=(
+        r"^3B-MO\.MS\.MRG\.3IMERG\.(?P<year>\d{4})(?P<month>\d{2})01"
+        r"-S000000-E235959\.\d{2}\.V\w+\.HDF5$"
+    ),
+)
+
+GPCP_CATALOGUE = CatalogueSpec(
+    base_url=(
+        "https://www.ncei.noaa.gov/data/"
+        "global-precipitation-climatology-project-gpcp-monthly/access/"
+    ),
+    file_pattern=r"^gpcp_v02r03_monthly_d(?P<year>\d{4})(?P<month>\d{2})_c\d{8}\.nc$",
+)
+
+
+def _cache_path(url: str, cache_dir: Path) -> Path:
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"{key}.json"
+
+
+def _parse_links(html: str, url: str) -> List[str]:
+    soup = BeautifulSoup(html, "lxml")
+    links = {urljoin(url, a["href"]) for a in soup.find_all("a", href=True)}
+    return sorted(links)
+
+
+def fetch_listing(
+    url: str,
+    *,
+    cache_dir: Path = CATALOGUE_CACHE_DIR,
+    session: requests.Session | None = None,
+    timeout: int = 60,
+) -> List[str]:
+    """Return the absolute links found in the directory listing at ``url``.
+
+    A cached copy is revalidated with ``If-None-Match``/``If-Modified-Since``
+    and reused as-is when the server answers ``304 Not Modified``.
+    """
+    http = session or requests.Session()
+    cache_file = _cache_path(url, cache_dir)
+    cached = None
+    if cache_file.exists():
+        cached = json.loads(cache_file.read_text(encoding="utf-8"))
+
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = http.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached is not None:
+        return cached["links"]
+    response.raise_for_status()
+
+    links = _parse_links(response.text, url)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_file.write_text(
+        json.dumps(
+            {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "links": links,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    return links
+
+
+def build_url_list(
+    spec: CatalogueSpec,
+    start_date: str = START_DATE,
+    end_date: str = END_DATE,
+    *,
+    cache_dir: Path = CATALOGUE_CACHE_DIR,
+    session: requests.Session | None = None,
+    timeout: int = 60,
+) -> List[str]:
+    """Crawl the yearly indexes of ``spec`` and list files in the date range.
+
+    When a month is published more than once (e.g. reprocessed GPCP files
+    with a newer creation date), the lexicographically latest name wins.
+    """
+    months = pd.date_range(start_date, end_date, freq="MS")
+    wanted = {(m.year, m.month) for m in months}
+    pattern = re.compile(spec.file_pattern)
+    http = session or requests.Session()
+
+    selected: Dict[Tuple[int, int], str] = {}
+    for year in sorted({year for year, _ in wanted}):
+        year_url = urljoin(spec.base_url, f"{year}/")
+        links = fetch_listing(year_url, cache_dir=cache_dir, session=http, timeout=timeout)
+        _select_links(links, pattern, wanted, selected)
+
+    return [selected[key] for key in sorted(selected)]
+
+
+def _select_links(links, pattern, wanted, selected) -> None:
+    for link in links:
+        name = Path(urlparse(link).path).name
+        match = pattern.match(name)
+        if match is None:
+            continue
+        key = (int(match["year"]), int(match["month"]))
+        if key not in wanted:
+            continue
+        if key not in selected or Path(selected[key]).name < name:
+            selected[key] = link
+
+
+def cached_months(
+    spec: CatalogueSpec,
+    start_date: str = START_DATE,
+    end_date: str = END_DATE,
+    *,
+    cache_dir: Path = CATALOGUE_CACHE_DIR,
+) -> Set[str] | None:
+    """``YYYY-MM`` months published by ``spec`` according to cached listings.
+
+    Never touches the network. Returns None when the listing of any year in
+    the range has not been cached yet.
+    """
+    months = pd.date_range(start_date, end_date, freq="MS")
+    wanted = {(m.year, m.month) for m in months}
+    pattern = re.compile(spec.file_pattern)
+
+    selected: Dict[Tuple[int, int], str] = {}
+    for year in sorted({year for year, _ in wanted}):
+        cache_file = _cache_path(urljoin(spec.base_url, f"{year}/"), cache_dir)
+        if not cache_file.exists():
+            return None
+        links = json.loads(cache_file.read_text(encoding="utf-8"))["links"]
+        _select_links(links, pattern, wanted, selected)
+
+    return {f"{year}-{month:02d}" for year, month in selected}
+
+
+def main():
+    for label, spec in [("IMERG", IMERG_CATALOGUE), ("GPCP", GPCP_CATALOGUE)]:
+        urls = build_url_list(spec)
+        print(f"{label}: {len(urls)} files between {START_DATE} and {END_DATE}")
+
+
+if __name__ == "__main__":
+    main()
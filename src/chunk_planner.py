@@ -0,0 +1,198 @@
+"""Memory-budget-aware chunk planning for the pipeline's xarray/dask reads.
+
+The planner only inspects file headers (dimensions, dtype, on-disk
+chunking and 1-D coordinates for the subset sizes), never the data. Chunks
+are shrunk along ``time`` first and then along the largest spatial
+dimension until ``workers`` concurrent chunks fit in the configured memory
+budget.
+
+Files read whole are opened with ``chunks=plan.chunks``; along those
+dimensions chunks are multiples of the on-disk chunking, so no stored
+chunk is decompressed by more than one task. Subsets (``sizes``) are
+opened on the on-disk chunking (``chunks={}``), selected, and then
+rechunked with ``.chunk(plan.chunks)``.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Sequence, Tuple
+
+import dask
+import netCDF4
+import numpy as np
+
+from src.config import MEMORY_BUDGET_MB, N_WORKERS
+
+# Copies of a chunk alive at once per worker: compressed read, decoded
+# array, intermediate result and output buffer.
+WORKING_COPIES = 4
+MB = 1024**2
+
+
+@dataclass(frozen=True)
+class VariableHeader:
+    path: Path
+    variable: str
+    dims: Tuple[str, ...]
+    shape: Tuple[int, ...]
+    itemsize: int
+    disk_chunks: Tuple[int, ...] | None
+
+
+@dataclass(frozen=True)
+class ChunkPlan:
+    stage: str
+    chunks: Dict[str, int]
+    sizes: Dict[str, int]
+    chunk_bytes: int
+    resident_bytes: int
+    peak_bytes: int
+    budget_bytes: int
+    workers: int
+
+    @property
+    def fits(self) -> bool:
+        return self.peak_bytes <= self.budget_bytes
+
+    def scheduler(self):
+        """Context manager limiting dask to the planned worker count."""
+        return dask.config.set(scheduler="threads", num_workers=self.workers)
+
+    def describe(self) -> str:
+        return (
+            f"[chunk plan] {self.stage}: chunks={self.chunks} of {self.sizes}, "
+            f"{self.chunk_bytes / MB:.1f} MB per chunk, "
+            f"est. peak {self.peak_bytes / MB:.1f} MB of "
+            f"{self.budget_bytes / MB:.0f} MB budget ({self.workers} workers)"
+        )
+
+
+def read_header(
+    path: Path,
+    variable: str,
+    *,
+    group: str | None = None,
+    bounds: Dict[str, Tuple[float, float]] | None = None,
+) -> Tuple[VariableHeader, Dict[str, int]]:
+    """Read the header of ``variable`` and the sizes of a coordinate subset.
+
+    ``bounds`` maps dimension names to inclusive ``(min, max)`` ranges; only
+    those 1-D coordinate variables are read to count the selected cells.
+    """
+    with netCDF4.Dataset(path) as nc:
+        grp = nc[group] if group else nc
+        var = grp.variables[variable]
+        chunking = var.chunking()
+        header = VariableHeader(
+            path=Path(path),
+            variable=variable,
+            dims=tuple(var.dimensions),
+            shape=tuple(int(n) for n in var.shape),
+            itemsize=int(var.dtype.itemsize),
+            disk_chunks=None if chunking == "contiguous" else tuple(int(c) for c in chunking),
+        )
+
+        sizes = {}
+        for dim, (lo, hi) in (bounds or {}).items():
+            coord = np.asarray(grp.variables[dim][:])
+            sizes[dim] = int(((coord >= lo) & (coord <= hi)).sum())
+
+    return header, sizes
+
+
+def plan_chunks(
+    stage: str,
+    header: VariableHeader,
+    *,
+    sizes: Dict[str, int] | None = None,
+    splittable: Sequence[str] | None = None,
+    resident_bytes: int = 0,
+    budget_mb: float = MEMORY_BUDGET_MB,
+    workers: int = N_WORKERS,
+    strict: bool = True,
+) -> ChunkPlan:
+    """Pick chunk sizes for ``header`` that fit ``workers`` in ``budget_mb``.
+
+    ``sizes`` overrides dimension lengths (e.g. the spatial subset, or the
+    number of files along ``time``); ``splittable`` limits which dimensions
+    may be chunked; ``resident_bytes`` is memory the stage holds regardless
+    of chunking. Raises ``RuntimeError`` with the estimate when even the
+    smallest chunks cannot fit, unless ``strict`` is False (then the
+    over-budget plan is returned; see ``ChunkPlan.fits``).
+    """
+    full = dict(zip(header.dims, header.shape))
+    full.update(sizes or {})
+    splittable = tuple(header.dims if splittable is None else splittable)
+    stored = dict(zip(header.dims, header.shape))
+    disk = dict(zip(header.dims, header.disk_chunks or header.shape))
+
+    def nbytes(chunks):
+        return math.prod(chunks.values()) * header.itemsize
+
+    budget = int(budget_mb * MB)
+    target = (budget - resident_bytes) / (workers * WORKING_COPIES)
+
+    # Spatial dimensions read whole are snapped to whole on-disk chunks. A
+    # subset is rechunked after selection, where stored chunk boundaries no
+    # longer line up, so it is left as planned. The budget is checked on
+    # the snapped chunks.
+    def unit(dim):
+        if dim == "time" or full[dim] != stored[dim]:
+            return 1
+        return max(1, min(disk[dim], full[dim]))
+
+    def snapped(chunks):
+        out = dict(chunks)
+        if header.disk_chunks:
+            for dim in out:
+                if unit(dim) > 1 and out[dim] < full[dim]:
+                    out[dim] = min(math.ceil(out[dim] / disk[dim]) * disk[dim], full[dim])
+        return out
+
+    chunks = dict(full)
+    order = [d for d in ("time",) if d in splittable] + sorted(
+        (d for d in splittable if d != "time" and d in full),
+        key=lambda d: full[d],
+        reverse=True,
+    )
+    for dim in order:
+        step = unit(dim)
+        while nbytes(snapped(chunks)) > target and chunks[dim] > step:
+            chunks[dim] = max(step, (math.ceil(chunks[dim] / 2) // step) * step)
+    chunks = snapped(chunks)
+
+    chunk_bytes = nbytes(chunks)
+    peak = resident_bytes + workers * WORKING_COPIES * chunk_bytes
+    plan = ChunkPlan(
+        stage=stage,
+        chunks=chunks,
+        sizes=full,
+        chunk_bytes=chunk_bytes,
+        resident_bytes=resident_bytes,
+        peak_bytes=peak,
+        budget_bytes=budget,
+        workers=workers,
+    )
+    if strict and not plan.fits:
+        raise RuntimeError(
+            f"{stage}: run does not fit the memory budget. Chunks {chunks} "
+            f"(smallest allowed along {', '.join(splittable)}) need ~{peak / MB:.0f} MB ({resident_bytes / MB:.0f} MB resident + "
+            f"{workers} workers x {WORKING_COPIES} x {chunk_bytes / MB:.1f} MB) but "
+            f"MEMORY_BUDGET_MB is {budget_mb:.0f}. Raise MEMORY_BUDGET_MB, lower "
+            "N_WORKERS, or shrink the period/domain in src/config.py."
+        )
+    return plan
+
+
+def plan_reads(stage: str, header: VariableHeader, **kwargs) -> ChunkPlan:
+    """Plan and log one stage's reads.
+
+    Stages run their computation inside ``plan.scheduler()`` so the worker
+    limit does not leak into the rest of the process.
+    """
+    plan = plan_chunks(stage, header, **kwargs)
+    print(plan.describe())
+    return plan
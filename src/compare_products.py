@@ -0,0 +1,170 @@
+"""Regrid N products to a common grid and compare every pair in one pass.
+
+Each product in ``COMPARE_PRODUCTS`` is read from its processed pipeline
+store when it has one (raw files through its adapter otherwise) and
+regridded onto the grid of ``TARGET_PRODUCT`` with the shared cached
+bilinear weights of ``src.regridding``, the same path the IMERG regrid
+stage uses. The common-grid series are kept in an appendable store, one
+variable per product, so a monthly update regrids only the new months.
+Pairwise metrics for all (product, reference) combinations are then
+accumulated in a single batched pass over time.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from src.chunk_planner import ChunkPlan, plan_reads, read_header
+from src.compute_metrics import (
+    WET_THRESHOLD_MM_DAY,
+    accumulate_sums,
+    derive_metrics,
+    metric_attrs,
+)
+from src.config import (
+    COMPARE_PRODUCTS,
+    LAT_MAX,
+    LAT_MIN,
+    LON_MAX,
+    LON_MIN,
+    PAIRWISE_METRICS_FILE,
+    PRODUCTS_COMMON_GRID_FILE,
+    TARGET_PRODUCT,
+    TIME_BLOCK,
+)
+from src.products import PRODUCTS, ProductAdapter
+from src.regridding import regrid_to_target
+from src.timeseries_store import (
+    append_to_store,
+    domain_signature,
+    month_keys,
+    plan_update,
+    select_months,
+)
+
+
+def compute_pairwise_metrics(
+    stack: xr.DataArray,
+    *,
+    wet_threshold: float = WET_THRESHOLD_MM_DAY,
+    time_block: int = TIME_BLOCK,
+) -> xr.Dataset:
+    """Metrics for every (product, reference) pair of a stacked array.
+
+    ``stack`` has dims ``(product, time, latitude, longitude)``. All ordered
+    pairs are broadcast into one batch so the record is traversed once.
+    """
+    stack = stack.transpose("time", "product", "latitude", "longitude")
+    data = stack.values
+    n_time, n_prod = data.shape[:2]
+    shape = (n_time, n_prod, n_prod) + data.shape[2:]
+
+    sums = accumulate_sums(
+        np.broadcast_to(data[:, :, None], shape),
+        np.broadcast_to(data[:, None, :], shape),
+        wet_threshold,
+        time_block,
+    )
+    fields = derive_metrics(*sums)
+
+    names = stack["product"].values
+    dims = ("product", "reference", "latitude", "longitude")
+    attrs = metric_attrs("product", "reference")
+    out = xr.Dataset(
+        {name: (dims, values, attrs[name]) for name, values in fields.items()},
+        coords={
+            "product": names,
+            "reference": names,
+            "latitude": stack["latitude"].values,
+            "longitude": stack["longitude"].values,
+        },
+    )
+    out.attrs["wet_threshold_mm_day"] = float(wet_threshold)
+    return out
+
+
+def common_grid_signature() -> str:
+    return (
+        f"{domain_signature()};products={','.join(COMPARE_PRODUCTS)};"
+        f"target={TARGET_PRODUCT}"
+    )
+
+
+def open_product(adapter: ProductAdapter) -> Tuple[xr.DataArray, ChunkPlan]:
+    """Open a product in standardized form, preferring its processed store."""
+    stage = f"compare_products[{adapter.name}]"
+    if adapter.store is not None and adapter.store.exists():
+        header, _ = read_header(adapter.store, adapter.store_variable)
+        plan = plan_reads(stage, header, splittable=("time",))
+        return adapter.open_store(chunks=plan.chunks), plan
+
+    month_files = adapter.month_files()
+    if not month_files:
+        raise RuntimeError(f"No {adapter.name} files found in {adapter.raw_dir}")
+    files = [month_files[m] for m in sorted(month_files)]
+    header, subset = read_header(
+        files[0],
+        adapter.variable,
+        group=adapter.group,
+        bounds={
+            adapter.lat_name: (LAT_MIN, LAT_MAX),
+            adapter.lon_name: (LON_MIN, LON_MAX),
+        },
+    )
+    plan = plan_reads(stage, header, sizes={**subset, "time": len(files)})
+    return adapter.open(files, chunks=plan.chunks), plan
+
+
+def update_common_grid() -> None:
+    """Regrid the months missing from the common-grid store and append them."""
+    fields: Dict[str, Tuple[xr.DataArray, ChunkPlan]] = {
+        name: open_product(PRODUCTS[name]) for name in COMPARE_PRODUCTS
+    }
+    common = set.intersection(
+        *(set(month_keys(da["time"].values)) for da, _ in fields.values())
+    )
+    pending = plan_update(PRODUCTS_COMMON_GRID_FILE, common, common_grid_signature())
+    if not pending:
+        print("Up to date:", PRODUCTS_COMMON_GRID_FILE)
+        return
+
+    target = fields[TARGET_PRODUCT][0]
+    lat = target["latitude"].values
+    lon = target["longitude"].values
+
+    regridded = {}
+    for name, (da, plan) in fields.items():
+        with plan.scheduler():
+            regridded[name] = regrid_to_target(
+                select_months(da, pending), lat, lon, time_block=plan.chunks["time"]
+            )
+    out = xr.Dataset(regridded)
+    out.attrs["note"] = (
+        f"Monthly precipitation (mm/day) of {', '.join(COMPARE_PRODUCTS)} "
+        f"regridded to the {TARGET_PRODUCT} grid with cached bilinear weights"
+    )
+    append_to_store(out, PRODUCTS_COMMON_GRID_FILE, common_grid_signature())
+    print(f"Common grid: appended {len(pending)} months on {TARGET_PRODUCT} grid {lat.size}x{lon.size}")
+    print("Saved:", PRODUCTS_COMMON_GRID_FILE.resolve())
+
+
+def main():
+    update_common_grid()
+
+    with xr.open_dataset(PRODUCTS_COMMON_GRID_FILE) as ds:
+        stack = xr.concat(
+            [ds[name] for name in COMPARE_PRODUCTS],
+            dim=pd.Index(list(COMPARE_PRODUCTS), name="product"),
+        ).load()
+
+    metrics = compute_pairwise_metrics(stack)
+    metrics.to_netcdf(PAIRWISE_METRICS_FILE)
+    print("Saved:", PAIRWISE_METRICS_FILE.resolve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Per-gridcell time-series skill metrics for IMERG against GPCP.
+
+Every metric is derived from a small set of running sums that are
+accumulated over blocks of time steps, so the (time, latitude, longitude)
+cube is traversed exactly once regardless of how many metrics are mapped.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import xarray as xr
+
+from src.chunk_planner import plan_reads, read_header
+from src.config import (
+    GPCP_SUBSET_FILE,
+    GRIDCELL_METRICS_FILE,
+    IMERG_REGRID_FILE,
+    TIME_BLOCK,
+)
+from src.export_tables import export_gridcell_metrics
+
+# Monthly mean rate (mm/day) at or above which a month counts as "wet".
+WET_THRESHOLD_MM_DAY = 1.0
+
+
+def metric_attrs(sim: str, obs: str) -> dict:
+    """Units and long names of every metric for ``sim`` evaluated against ``obs``."""
+    return {
+        "n_months": {"units": "1", "long_name": "Number of months with both products valid"},
+        "pearson_r": {"units": "1", "long_name": f"Pearson correlation ({sim} vs {obs})"},
+        "bias_mm_day": {"units": "mm/day", "long_name": f"Mean bias ({sim} - {obs})"},
+        "relative_bias": {"units": "1", "long_name": f"Mean bias relative to {obs} mean"},
+        "rmse_mm_day": {"units": "mm/day", "long_name": "Root-mean-square difference"},
+        "kge": {"units": "1", "long_name": "Kling-Gupta efficiency"},
+        "kge_alpha": {"units": "1", "long_name": f"KGE variability ratio (std {sim} / std {obs})"},
+        "kge_beta": {"units": "1", "long_name": f"KGE bias ratio (mean {sim} / mean {obs})"},
+        "wet_dry_agreement": {
+            "units": "1",
+            "long_name": "Fraction of months agreeing on wet/dry classification",
+        },
+    }
+
+
+METRIC_ATTRS = metric_attrs("IMERG", "GPCP")
+
+
+def accumulate_sums(sim, obs, wet_threshold, time_block):
+    """Accumulate first/second moments and wet/dry agreement over time.
+
+    ``sim`` and ``obs`` share a shape whose first axis is time; any trailing
+    shape (a grid, or a batch of product pairs on a grid) is reduced over.
+    """
+    spatial_shape = sim.shape[1:]
+    n = np.zeros(spatial_shape, dtype=np.float64)
+    sx = np.zeros(spatial_shape, dtype=np.float64)
+    sy = np.zeros(spatial_shape, dtype=np.float64)
+    sxx = np.zeros(spatial_shape, dtype=np.float64)
+    syy = np.zeros(spatial_shape, dtype=np.float64)
+    sxy = np.zeros(spatial_shape, dtype=np.float64)
+    agree = np.zeros(spatial_shape, dtype=np.float64)
+
+    for start in range(0, sim.shape[0], time_block):
+        x = np.asarray(sim[start:start + time_block], dtype=np.float64)
+        y = np.asarray(obs[start:start + time_block], dtype=np.float64)
+        valid = np.isfinite(x) & np.isfinite(y)
+        x = np.where(valid, x, 0.0)
+        y = np.where(valid, y, 0.0)
+
+        n += valid.sum(axis=0)
+        sx += x.sum(axis=0)
+        sy += y.sum(axis=0)
+        sxx += (x * x).sum(axis=0)
+        syy += (y * y).sum(axis=0)
+        sxy += (x * y).sum(axis=0)
+        agree += (valid & ((x >= wet_threshold) == (y >= wet_threshold))).sum(axis=0)
+
+    return n, sx, sy, sxx, syy, sxy, agree
+
+
+def derive_metrics(n, sx, sy, sxx, syy, sxy, agree):
+    """Turn the sums from ``accumulate_sums`` into the named metric arrays."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n_safe = np.where(n > 0, n, np.nan)
+        mean_x = sx / n_safe
+        mean_y = sy / n_safe
+        var_x = np.maximum(sxx / n_safe - mean_x**2, 0.0)
+        var_y = np.maximum(syy / n_safe - mean_y**2, 0.0)
+        cov = sxy / n_safe - mean_x * mean_y
+        std_x = np.sqrt(var_x)
+        std_y = np.sqrt(var_y)
+
+        r = cov / (std_x * std_y)
+        bias = mean_x - mean_y
+        mse = np.maximum((sxx - 2.0 * sxy + syy) / n_safe, 0.0)
+        alpha = std_x / std_y
+        beta = mean_x / mean_y
+        kge = 1.0 - np.sqrt((r - 1.0) ** 2 + (alpha - 1.0) ** 2 + (beta - 1.0) ** 2)
+
+        fields = {
+            "n_months": n,
+            "pearson_r": r,
+            "bias_mm_day": bias,
+            "relative_bias": bias / mean_y,
+            "rmse_mm_day": np.sqrt(mse),
+            "kge": kge,
+            "kge_alpha": alpha,
+            "kge_beta": beta,
+            "wet_dry_agreement": agree / n_safe,
+        }
+    return fields
+
+
+def compute_gridcell_metrics(
+    imerg: xr.DataArray,
+    gpcp: xr.DataArray,
+    *,
+    wet_threshold: float = WET_THRESHOLD_MM_DAY,
+    time_block: int = TIME_BLOCK,
+) -> xr.Dataset:
+    """Compute the full metric suite for two aligned (time, lat, lon) arrays.
+
+    ``imerg`` is treated as the simulation and ``gpcp`` as the reference.
+    Inputs may be dask-backed; only ``time_block`` time steps are held in
+    memory at once.
+    """
+    imerg = imerg.transpose("time", "latitude", "longitude")
+    gpcp = gpcp.transpose("time", "latitude", "longitude")
+    if imerg.shape != gpcp.shape:
+        raise ValueError(
+            f"IMERG shape {imerg.shape} does not match GPCP shape {gpcp.shape}"
+        )
+
+    sums = accumulate_sums(imerg.data, gpcp.data, wet_threshold, time_block)
+    fields = derive_metrics(*sums)
+
+    coords = {
+        "latitude": imerg["latitude"].values,
+        "longitude": imerg["longitude"].values,
+    }
+    out = xr.Dataset(
+        {
+            name: (("latitude", "longitude"), values, METRIC_ATTRS[name])
+            for name, values in fields.items()
+        },
+        coords=coords,
+    )
+    out.attrs["wet_threshold_mm_day"] = float(wet_threshold)
+    return out
+
+
+def main():
+    header, _ = read_header(IMERG_REGRID_FILE, "imerg_precip_mm_day")
+    plan = plan_reads("compute_metrics", header, splittable=("time",))
+
+    im = xr.open_dataset(IMERG_REGRID_FILE, chunks=plan.chunks)["imerg_precip_mm_day"]
+    gp = xr.open_dataset(GPCP_SUBSET_FILE, chunks=plan.chunks)["precip_mm_day"]
+
+    # Force shared time dtype/values for stable alignment and comparison.
+    if im.sizes["time"] == gp.sizes["time"]:
+        im = im.assign_coords(time=gp["time"].values)
+
+    im_a, gp_a = xr.align(im, gp, join="inner")
+
+    with plan.scheduler():
+        metrics = compute_gridcell_metrics(im_a, gp_a, time_block=plan.chunks["time"])
+    metrics.attrs["note"] = (
+        "Per-gridcell monthly skill metrics of regridded IMERG against GPCP"
+    )
+    metrics.attrs["time_start"] = str(im_a["time"].values[0])[:10]
+    metrics.attrs["time_end"] = str(im_a["time"].values[-1])[:10]
+
+    GRIDCELL_METRICS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    metrics.to_netcdf(GRIDCELL_METRICS_FILE)
+
+    export_gridcell_metrics(metrics, im_a["time"].values)
+
+    print("Gridcell metrics complete")
+    print("Saved:", GRIDCELL_METRICS_FILE.resolve())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 # src/concatenate_imerg.py
 
 from pathlib import Path
-import xarray as xr
 
 from src.config import (
     IMERG_RAW_DIR,
@@ -12,6 +11,9 @@ from src.config import (
     LON_MIN,
     LON_MAX,
 )
+from src.chunk_planner import plan_reads, read_header
+from src.products import IMERG
+from src.timeseries_store import append_to_store, domain_signature, plan_update
 
 # -------------------------------------------------------------------
 # Resolve project root and output path
@@ -27,9 +29,7 @@ def main():
     # ----------------------------------------------------------------
     # Collect IMERG monthly files
     # ----------------------------------------------------------------
-    files = sorted(
-        IMERG_RAW_DIR.glob("3B-MO.MS.MRG.3IMERG.*.HDF5")
-    )
+    files = IMERG.list_files()
 
     if not files:
         raise RuntimeError(f"No IMERG files found in {IMERG_RAW_DIR}")
@@ -37,19 +37,35 @@ def main():
     print(f"Found {len(files)} IMERG files")
 
     # ----------------------------------------------------------------
-    # Open and concatenate
+    # Only months missing from the processed store are read
     # ----------------------------------------------------------------
-    ds = xr.open_mfdataset(
-        files,
-        engine="netcdf4",
-        group="Grid",
-        combine="by_coords",
-        data_vars="minimal",
-        coords="minimal",
-        compat="override",
+    month_files = IMERG.month_files()
+    pending = plan_update(OUT_PATH, month_files, domain_signature())
+    if not pending:
+        print(f"Up to date: {OUT_PATH}")
+        return
+
+    print(f"Processing {len(pending)} new IMERG months")
+
+    header, subset = read_header(
+        month_files[pending[0]],
+        IMERG.variable,
+        group=IMERG.group,
+        bounds={
+            IMERG.lat_name: (LAT_MIN, LAT_MAX),
+            IMERG.lon_name: (LON_MIN, LON_MAX),
+        },
     )
+    plan = plan_reads(
+        "concatenate_imerg", header, sizes={**subset, "time": len(pending)}
+    )
+
+    # ----------------------------------------------------------------
+    # Open and concatenate
+    # ----------------------------------------------------------------
+    ds = IMERG.open_native([month_files[m] for m in pending])
 
-    pr = ds["precipitation"]
+    pr = ds[IMERG.variable]
 
     # ----------------------------------------------------------------
     # Subset time (monthly timestamps)
@@ -62,13 +78,16 @@ def main():
     pr = pr.sel(
         lat=slice(LAT_MIN, LAT_MAX),
         lon=slice(LON_MIN, LON_MAX),
-    )
+    ).chunk(plan.chunks)
 
     # ----------------------------------------------------------------
-    # Save processed dataset
+    # Append to processed dataset
     # ----------------------------------------------------------------
     out = pr.to_dataset(name="precip_mm_hr")
-    out.to_netcdf(OUT_PATH)
+    with plan.scheduler():
+        append_to_store(
+            out, OUT_PATH, domain_signature(), time_block=plan.chunks["time"]
+        )
 
     print(f"Saved: {OUT_PATH}")
 
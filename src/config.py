@@ -12,6 +12,7 @@ RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
 
 IMERG_RAW_DIR = RAW_DIR / "imerg_monthly"
+CATALOGUE_CACHE_DIR = RAW_DIR / ".catalogue_cache"
 
 # ------------------
 # Time configuration
@@ -34,3 +35,31 @@ LON_MAX = 90.0
 IMERG_CONCAT_FILE = PROCESSED_DIR / "imerg_north_india.nc"
 IMERG_MM_DAY_FILE = PROCESSED_DIR / "imerg_north_india_mmday.nc"
 GPCP_SUBSET_FILE  = PROCESSED_DIR / "gpcp_north_india.nc"
+IMERG_REGRID_FILE = PROCESSED_DIR / "imerg_north_india_on_gpcp_grid.nc"
+GRIDCELL_METRICS_FILE = PROCESSED_DIR / "gridcell_metrics_imerg_vs_gpcp.nc"
+PRODUCTS_COMMON_GRID_FILE = PROCESSED_DIR / "products_on_common_grid.nc"
+PAIRWISE_METRICS_FILE = PROCESSED_DIR / "pairwise_metrics.nc"
+REGRID_WEIGHTS_DIR = PROCESSED_DIR / "regrid_weights"
+REGION_MASK_DIR = PROCESSED_DIR / "region_masks"
+RUN_HISTORY_FILE = PROCESSED_DIR / "run_history.jsonl"
+IMERG_PYRAMID_FILE = PROCESSED_DIR / "imerg_north_india_pyramid.nc"
+TABLES_DIR = PROCESSED_DIR / "tables"
+
+# ------------------
+# Multi-product comparison
+# ------------------
+COMPARE_PRODUCTS = ("imerg", "gpcp")
+TARGET_PRODUCT = "gpcp"
+
+# ------------------
+# Multi-resolution pyramid (degrees, finest first)
+# ------------------
+PYRAMID_RESOLUTIONS = (0.25, 0.5, 1.0, 2.5)
+
+# ------------------
+# Compute resources
+# ------------------
+MEMORY_BUDGET_MB = 4096
+N_WORKERS = 4
+# Time steps per block in the streaming metric and regridding passes
+TIME_BLOCK = 12
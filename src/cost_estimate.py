@@ -0,0 +1,391 @@
+"""Dry-run cost estimate for the configured pipeline run.
+
+The estimate is built from the raw file index (file names and sizes), one
+header per product and the month lists of the processed stores, so it
+returns in well under a second even for multi-decade configurations.
+Months of the configured period that are not on disk yet are counted too,
+at the median local file size: the months published according to the
+cached catalogue listings, or every configured month when a year's
+listing has not been cached. Stages whose chunk plan exceeds
+``MEMORY_BUDGET_MB`` are reported as not fitting instead of failing. Wall
+time is calibrated from the per-stage timings that ``run_pipeline``
+appends to ``RUN_HISTORY_FILE`` after every completed run.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from src.build_pyramid import level_grid, pyramid_signature
+from src.catalogue import GPCP_CATALOGUE, IMERG_CATALOGUE, cached_months
+from src.chunk_planner import MB, VariableHeader, plan_chunks, read_header
+from src.compare_products import common_grid_signature
+from src.compute_metrics import METRIC_ATTRS
+from src.config import (
+    COMPARE_PRODUCTS,
+    END_DATE,
+    GPCP_SUBSET_FILE,
+    IMERG_CONCAT_FILE,
+    IMERG_MM_DAY_FILE,
+    IMERG_PYRAMID_FILE,
+    IMERG_REGRID_FILE,
+    LAT_MAX,
+    LAT_MIN,
+    LON_MAX,
+    LON_MIN,
+    MEMORY_BUDGET_MB,
+    PRODUCTS_COMMON_GRID_FILE,
+    PYRAMID_RESOLUTIONS,
+    RUN_HISTORY_FILE,
+    START_DATE,
+    TARGET_PRODUCT,
+)
+from src.products import GPCP, IMERG, PRODUCTS
+from src.timeseries_store import domain_signature, month_keys, pending_months
+
+# Used until a stage has timings in the run history.
+DEFAULT_MB_PER_S = 50.0
+HISTORY_RUNS = 10
+FLOAT32 = 4
+FLOAT64 = 8
+
+CATALOGUES = {"imerg": IMERG_CATALOGUE, "gpcp": GPCP_CATALOGUE}
+
+
+@dataclass(frozen=True)
+class StageEstimate:
+    stage: str
+    files: int
+    read_bytes: int
+    decompressed_bytes: int
+    peak_bytes: int
+    output_bytes: int
+    seconds: float = 0.0
+    fits: bool = True
+
+    @property
+    def work_bytes(self) -> int:
+        return max(self.read_bytes, self.decompressed_bytes)
+
+
+@dataclass(frozen=True)
+class _ProductIndex:
+    header: VariableHeader
+    subset: Dict[str, int]
+    month_files: Dict[str, Path]
+    missing: Tuple[str, ...] = ()
+
+    @property
+    def months(self) -> List[str]:
+        """Configured months, whether on disk or still to download."""
+        return sorted(set(self.month_files) | set(self.missing))
+
+    @property
+    def typical_file_bytes(self) -> int:
+        return int(statistics.median(f.stat().st_size for f in self.month_files.values()))
+
+    @property
+    def cells(self) -> int:
+        return math.prod(self.subset.values())
+
+    def touched_bytes_per_file(self) -> int:
+        """Upper bound of decompressed bytes per file after subset pushdown."""
+        stored = dict(zip(self.header.dims, self.header.shape))
+        disk = dict(zip(self.header.dims, self.header.disk_chunks or self.header.shape))
+        extent = 1
+        for dim in self.header.dims:
+            if dim not in self.subset:
+                extent *= stored[dim]
+                continue
+            spans = math.ceil(self.subset[dim] / disk[dim]) + 1
+            extent *= min(stored[dim], spans * disk[dim])
+        return extent * self.header.itemsize
+
+
+def _index(adapter) -> _ProductIndex:
+    month_files = adapter.month_files()
+    if not month_files:
+        raise RuntimeError(f"No {adapter.name} files found in {adapter.raw_dir}")
+    header, subset = read_header(
+        next(iter(month_files.values())),
+        adapter.variable,
+        group=adapter.group,
+        bounds={
+            adapter.lat_name: (LAT_MIN, LAT_MAX),
+            adapter.lon_name: (LON_MIN, LON_MAX),
+        },
+    )
+    configured = set(month_keys(pd.date_range(START_DATE, END_DATE, freq="MS")))
+    published = None
+    if adapter.name in CATALOGUES:
+        published = cached_months(CATALOGUES[adapter.name])
+    expected = configured if published is None else published & configured
+    return _ProductIndex(
+        header=header,
+        subset=subset,
+        month_files=month_files,
+        missing=tuple(sorted(expected - set(month_files))),
+    )
+
+
+def _pending(path, months, signature=None, group=None) -> List[str]:
+    return pending_months(path, months, signature or domain_signature(), group)[0]
+
+
+def _grid_header(months: int, subset: Dict[str, int], itemsize: int = FLOAT32) -> VariableHeader:
+    dims = ("time",) + tuple(subset)
+    return VariableHeader(
+        path=None,
+        variable="",
+        dims=dims,
+        shape=(months,) + tuple(subset.values()),
+        itemsize=itemsize,
+        disk_chunks=None,
+    )
+
+
+def _download_stage(stage, product: _ProductIndex) -> StageEstimate:
+    size = len(product.missing) * product.typical_file_bytes
+    return StageEstimate(
+        stage=stage,
+        files=len(product.missing),
+        read_bytes=size,
+        decompressed_bytes=0,
+        peak_bytes=0,
+        output_bytes=size,
+    )
+
+
+def _raw_stage(stage, product: _ProductIndex, months: List[str]) -> StageEstimate:
+    local = [product.month_files[m] for m in months if m in product.month_files]
+    to_download = len(months) - len(local)
+    plan = plan_chunks(
+        stage,
+        product.header,
+        sizes={**product.subset, "time": max(len(months), 1)},
+        strict=False,
+    )
+    return StageEstimate(
+        stage=stage,
+        files=len(months),
+        read_bytes=sum(f.stat().st_size for f in local) + to_download * product.typical_file_bytes,
+        decompressed_bytes=len(months) * product.touched_bytes_per_file(),
+        peak_bytes=plan.peak_bytes,
+        output_bytes=len(months) * product.cells * product.header.itemsize,
+        fits=plan.fits,
+    )
+
+
+def _grid_stage(stage, months, subset, *, inputs=1, output_bytes=None, resident=False) -> StageEstimate:
+    header = _grid_header(max(months, 1), subset)
+    size = months * math.prod(subset.values()) * FLOAT32
+    plan = plan_chunks(
+        stage,
+        header,
+        splittable=("time",),
+        resident_bytes=inputs * size if resident else 0,
+        strict=False,
+    )
+    return StageEstimate(
+        stage=stage,
+        files=inputs if months else 0,
+        read_bytes=inputs * size,
+        decompressed_bytes=inputs * size,
+        peak_bytes=plan.peak_bytes,
+        output_bytes=size if output_bytes is None else output_bytes,
+        fits=plan.fits,
+    )
+
+
+def load_throughputs(history_file: Path = RUN_HISTORY_FILE) -> Dict[str, float]:
+    """Median bytes/second per stage over the most recent recorded runs."""
+    if not history_file.exists():
+        return {}
+    runs = [
+        json.loads(line)
+        for line in history_file.read_text(encoding="utf-8").splitlines()
+        if line.strip()
+    ][-HISTORY_RUNS:]
+
+    rates: Dict[str, List[float]] = {}
+    for run in runs:
+        for stage in run["stages"]:
+            if stage["seconds"] > 0 and stage["work_bytes"] > 0:
+                rates.setdefault(stage["stage"], []).append(
+                    stage["work_bytes"] / stage["seconds"]
+                )
+    return {stage: statistics.median(values) for stage, values in rates.items()}
+
+
+def estimate_pipeline() -> List[StageEstimate]:
+    """Estimate the cost of every processing stage for the current config."""
+    imerg = _index(IMERG)
+    gpcp = _index(GPCP)
+    imerg_months = imerg.months
+    gpcp_months = gpcp.months
+    common = len(set(imerg_months) & set(gpcp_months))
+
+    estimates = [
+        _download_stage("download_imerg", imerg),
+        _download_stage("download_gpcp", gpcp),
+        _raw_stage("concatenate_imerg", imerg, _pending(IMERG_CONCAT_FILE, imerg_months)),
+        _grid_stage("unit_convert_imerg", len(_pending(IMERG_MM_DAY_FILE, imerg_months)), imerg.subset),
+        _raw_stage("extract_gpcp", gpcp, _pending(GPCP_SUBSET_FILE, gpcp_months)),
+    ]
+
+    regrid_months = len(_pending(IMERG_REGRID_FILE, imerg_months))
+    estimates.append(
+        _grid_stage(
+            "regrid_imerg_to_gpcp",
+            regrid_months,
+            imerg.subset,
+            output_bytes=regrid_months * gpcp.cells * FLOAT32,
+        )
+    )
+    estimates.append(_grid_stage("sanity_check_regrid", common, gpcp.subset, inputs=2, output_bytes=0, resident=True))
+    estimates.append(
+        _grid_stage(
+            "compute_metrics",
+            common,
+            gpcp.subset,
+            inputs=2,
+            output_bytes=len(METRIC_ATTRS) * gpcp.cells * FLOAT64,
+        )
+    )
+
+    # Only months missing from the common-grid store are regridded; the
+    # pairwise metrics then read the whole common-grid record.
+    indexes = {"imerg": imerg, "gpcp": gpcp}
+    for name in set(COMPARE_PRODUCTS) | {TARGET_PRODUCT}:
+        if name not in indexes:
+            indexes[name] = _index(PRODUCTS[name])
+    compare_months = set.intersection(*(set(indexes[n].months) for n in COMPARE_PRODUCTS))
+    compare_pending = _pending(PRODUCTS_COMMON_GRID_FILE, compare_months, common_grid_signature())
+
+    compare = []
+    for name in COMPARE_PRODUCTS:
+        if PRODUCTS[name].store is not None:
+            compare.append(_grid_stage("compare_products", len(compare_pending), indexes[name].subset))
+        else:
+            compare.append(_raw_stage("compare_products", indexes[name], compare_pending))
+    n_prod = len(COMPARE_PRODUCTS)
+    target_cells = indexes[TARGET_PRODUCT].cells
+    stack_bytes = n_prod * len(compare_months) * target_cells * FLOAT32
+    compare_peak = max(e.peak_bytes for e in compare) + n_prod**2 * len(compare_months) * target_cells * FLOAT64
+    estimates.append(
+        StageEstimate(
+            stage="compare_products",
+            files=sum(e.files for e in compare) + 1,
+            read_bytes=sum(e.read_bytes for e in compare) + stack_bytes,
+            decompressed_bytes=sum(e.decompressed_bytes for e in compare) + stack_bytes,
+            peak_bytes=compare_peak,
+            output_bytes=n_prod * len(compare_pending) * target_cells * FLOAT32
+            + n_prod**2 * len(METRIC_ATTRS) * target_cells * FLOAT64,
+            fits=all(e.fits for e in compare) and compare_peak <= MEMORY_BUDGET_MB * MB,
+        )
+    )
+
+    # Upper bound on cells per level: snapped edges add at most one cell per axis.
+    level_cells = sum(
+        math.ceil((LAT_MAX - LAT_MIN) / r + 1) * math.ceil((LON_MAX - LON_MIN) / r + 1)
+        for r in PYRAMID_RESOLUTIONS
+    )
+    pyramid_months = len(
+        set().union(
+            *(
+                _pending(IMERG_PYRAMID_FILE, imerg_months, pyramid_signature(), level_grid(r).group)
+                for r in PYRAMID_RESOLUTIONS
+            )
+        )
+    )
+    estimates.append(
+        _grid_stage(
+            "build_pyramid",
+            pyramid_months,
+            imerg.subset,
+            output_bytes=pyramid_months * level_cells * FLOAT32,
+        )
+    )
+
+    rates = load_throughputs()
+    return [
+        StageEstimate(
+            **{
+                **asdict(e),
+                "seconds": e.work_bytes / rates.get(e.stage, DEFAULT_MB_PER_S * MB),
+            }
+        )
+        for e in estimates
+    ]
+
+
+def record_run(
+    estimates: List[StageEstimate],
+    timings: Dict[str, float],
+    history_file: Path = RUN_HISTORY_FILE,
+) -> None:
+    """Append measured stage timings next to their estimated work."""
+    stages = [
+        {
+            "stage": e.stage,
+            "seconds": timings[e.stage],
+            "work_bytes": e.work_bytes,
+            "files": e.files,
+        }
+        for e in estimates
+        if e.stage in timings
+    ]
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    with history_file.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps({"recorded_at": time.time(), "stages": stages}) + "\n")
+
+
+def format_report(estimates: List[StageEstimate]) -> str:
+    calibrated = load_throughputs()
+    lines = [
+        f"{'stage':<22}{'files':>7}{'read MB':>10}{'decomp MB':>11}"
+        f"{'peak MB':>10}{'out MB':>9}{'time s':>9}"
+    ]
+    for e in estimates:
+        lines.append(
+            f"{e.stage:<22}{e.files:>7}{e.read_bytes / MB:>10.1f}"
+            f"{e.decompressed_bytes / MB:>11.1f}{e.peak_bytes / MB:>10.1f}"
+            f"{e.output_bytes / MB:>9.1f}{e.seconds:>9.1f}"
+            + ("" if e.stage in calibrated else "  (uncalibrated)")
+            + ("" if e.fits else "  DOES NOT FIT MEMORY_BUDGET_MB")
+        )
+    lines.append(
+        f"{'total':<22}{sum(e.files for e in estimates):>7}"
+        f"{sum(e.read_bytes for e in estimates) / MB:>10.1f}"
+        f"{sum(e.decompressed_bytes for e in estimates) / MB:>11.1f}"
+        f"{max(e.peak_bytes for e in estimates) / MB:>10.1f}"
+        f"{sum(e.output_bytes for e in estimates) / MB:>9.1f}"
+        f"{sum(e.seconds for e in estimates):>9.1f}"
+    )
+    missing = [e for e in estimates if e.stage.startswith("download_") and e.files]
+    if missing:
+        lines.append(
+            "Not on disk yet: "
+            + ", ".join(f"{e.files} {e.stage[len('download_'):].upper()} files" for e in missing)
+            + " (run the download steps before processing)."
+        )
+    return "\n".join(lines)
+
+
+def main():
+    start = time.perf_counter()
+    estimates = estimate_pipeline()
+    print(format_report(estimates))
+    print(f"Estimated in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
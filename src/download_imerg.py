@@ -12,7 +12,8 @@ from typing import List
 
 import requests
 
-from src.config import IMERG_RAW_DIR
+from src.catalogue import IMERG_CATALOGUE, build_url_list
+from src.config import END_DATE, IMERG_RAW_DIR, START_DATE
 
 IMERG_GLOB = "3B-MO.MS.MRG.3IMERG.*.HDF5"
 
@@ -38,7 +39,8 @@ def ensure_imerg_data(
     """Ensure IMERG files are present.
 
     When ``download`` is False, this function only checks local files and never
-    performs a network request.
+    performs a network request. When ``urls`` is not given, the URL list for
+    ``START_DATE``..``END_DATE`` is built by crawling the provider catalogue.
     """
     raw_dir.mkdir(parents=True, exist_ok=True)
     local_files = list_local_files(raw_dir)
@@ -52,10 +54,14 @@ def ensure_imerg_data(
     if not download:
         raise RuntimeError(
             f"No IMERG files found in {raw_dir}. "
-            "Re-run with download=True and a URL list to fetch files."
+            "Re-run with download=True to fetch files."
         )
 
-    candidate_urls = urls or []
+    candidate_urls = urls
+    if candidate_urls is None:
+        candidate_urls = build_url_list(
+            IMERG_CATALOGUE, START_DATE, END_DATE, timeout=timeout
+        )
     downloaded = 0
     for url in candidate_urls:
         target = raw_dir / Path(url).name
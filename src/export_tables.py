@@ -0,0 +1,202 @@
+"""Tidy columnar tables of sanity-check and metric results.
+
+Stages append their results to three tables under ``TABLES_DIR`` so
+dashboards can query every run without opening NetCDF or recomputing:
+
+- ``area_means``: one row per run, region and month
+- ``gridcell_metrics``: one row per run and grid cell
+- ``runs``: one row per run and stage with its period and domain
+
+Every row carries a ``run_id``; stages executed in the same process (e.g.
+by ``run_pipeline``) share one. Tables are written as Parquet, one file per
+export in ``<table>/``, when ``pyarrow`` is installed, and otherwise
+appended to ``<table>.csv``. ``read_table`` returns the concatenation of both.
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import pandas as pd
+import xarray as xr
+
+from src.config import (
+    END_DATE,
+    LAT_MAX,
+    LAT_MIN,
+    LON_MAX,
+    LON_MIN,
+    START_DATE,
+    TABLES_DIR,
+)
+from src.timeseries_store import domain_signature
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+
+AREA_MEAN_COLUMNS = [
+    "run_id",
+    "region",
+    "time",
+    "imerg_mm_day",
+    "gpcp_mm_day",
+    "diff_mm_day",
+]
+RUN_COLUMNS = [
+    "run_id",
+    "stage",
+    "created_at",
+    "start_date",
+    "end_date",
+    "time_start",
+    "time_end",
+    "n_months",
+    "lat_min",
+    "lat_max",
+    "lon_min",
+    "lon_max",
+    "domain_signature",
+    "table_format",
+]
+
+_RUN_ID = None
+
+
+def current_run_id() -> str:
+    """Identifier shared by every export made from this process."""
+    global _RUN_ID
+    if _RUN_ID is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        _RUN_ID = f"{stamp}-{uuid.uuid4().hex[:8]}"
+    return _RUN_ID
+
+
+def table_format() -> str:
+    return "parquet" if pyarrow is not None else "csv"
+
+
+def append_table(name: str, df: pd.DataFrame, *, tables_dir=TABLES_DIR) -> None:
+    """Append the rows of ``df`` to table ``name``.
+
+    CSV rows are written in the column order of the existing header; a
+    different set of columns raises instead of misaligning the file.
+    """
+    tables_dir.mkdir(parents=True, exist_ok=True)
+    if table_format() == "parquet":
+        part_dir = tables_dir / name
+        part_dir.mkdir(exist_ok=True)
+        part = f"{df['run_id'].iloc[0]}-{uuid.uuid4().hex[:8]}.parquet"
+        df.to_parquet(part_dir / part, index=False)
+        return
+
+    path = tables_dir / f"{name}.csv"
+    if path.exists():
+        columns = list(pd.read_csv(path, nrows=0).columns)
+        if set(columns) != set(df.columns):
+            raise RuntimeError(
+                f"Columns of '{name}' changed from {columns} to {list(df.columns)}; "
+                f"move {path} aside to start a new table."
+            )
+        df[columns].to_csv(path, mode="a", header=False, index=False)
+        return
+    df.to_csv(path, index=False)
+
+
+def read_table(name: str, *, tables_dir=TABLES_DIR) -> pd.DataFrame:
+    """All rows of table ``name`` across runs and storage formats."""
+    frames: List[pd.DataFrame] = []
+    part_dir = tables_dir / name
+    if part_dir.is_dir():
+        frames += [pd.read_parquet(p) for p in sorted(part_dir.glob("*.parquet"))]
+    csv = tables_dir / f"{name}.csv"
+    if csv.exists():
+        frames.append(pd.read_csv(csv))
+    if not frames:
+        raise RuntimeError(f"No '{name}' table found in {tables_dir}")
+    return pd.concat(frames, ignore_index=True)
+
+
+def area_mean_table(run_id: str, series: Dict[str, tuple]) -> pd.DataFrame:
+    """Tidy per-month area means from ``{region: (imerg, gpcp)}`` series."""
+    frames = []
+    for region, (imerg, gpcp) in series.items():
+        frames.append(
+            pd.DataFrame(
+                {
+                    "run_id": run_id,
+                    "region": region,
+                    "time": pd.to_datetime(imerg["time"].values).strftime("%Y-%m-%d"),
+                    "imerg_mm_day": imerg.values,
+                    "gpcp_mm_day": gpcp.values,
+                    "diff_mm_day": imerg.values - gpcp.values,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)[AREA_MEAN_COLUMNS]
+
+
+def gridcell_metric_table(run_id: str, metrics: xr.Dataset) -> pd.DataFrame:
+    """One row per grid cell with every metric as a column."""
+    df = metrics.to_dataframe().reset_index()
+    df.insert(0, "run_id", run_id)
+    return df
+
+
+def run_record(run_id: str, stage: str, time) -> pd.DataFrame:
+    times = pd.to_datetime(time)
+    row = {
+        "run_id": run_id,
+        "stage": stage,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "start_date": START_DATE,
+        "end_date": END_DATE,
+        "time_start": times.min().strftime("%Y-%m-%d"),
+        "time_end": times.max().strftime("%Y-%m-%d"),
+        "n_months": len(times),
+        "lat_min": LAT_MIN,
+        "lat_max": LAT_MAX,
+        "lon_min": LON_MIN,
+        "lon_max": LON_MAX,
+        "domain_signature": domain_signature(),
+        "table_format": table_format(),
+    }
+    return pd.DataFrame([row], columns=RUN_COLUMNS)
+
+
+def export_area_means(series: Dict[str, tuple], *, tables_dir=TABLES_DIR) -> str:
+    """Append area means and the run record for the sanity-check stage."""
+    run_id = current_run_id()
+    table = area_mean_table(run_id, series)
+    append_table("area_means", table, tables_dir=tables_dir)
+    append_table(
+        "runs",
+        run_record(run_id, "sanity_check_regrid", table["time"].unique()),
+        tables_dir=tables_dir,
+    )
+    return run_id
+
+
+def export_gridcell_metrics(metrics: xr.Dataset, time, *, tables_dir=TABLES_DIR) -> str:
+    """Append per-gridcell metrics and the run record for the metrics stage."""
+    run_id = current_run_id()
+    append_table("gridcell_metrics", gridcell_metric_table(run_id, metrics), tables_dir=tables_dir)
+    append_table("runs", run_record(run_id, "compute_metrics", time), tables_dir=tables_dir)
+    return run_id
+
+
+def main():
+    for name in ("runs", "area_means", "gridcell_metrics"):
+        try:
+            df = read_table(name)
+        except RuntimeError as exc:
+            print(exc)
+            continue
+        print(f"{name}: {len(df)} rows from {df['run_id'].nunique()} runs")
+
+
+if __name__ == "__main__":
+    main()
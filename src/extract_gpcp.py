@@ -1,10 +1,8 @@
 # src/extract_gpcp.py
 
 from pathlib import Path
-import xarray as xr
 
 from src.config import (
-    RAW_DIR,
     PROCESSED_DIR,
     START_DATE,
     END_DATE,
@@ -14,26 +12,42 @@ from src.config import (
     LON_MAX,
     GPCP_SUBSET_FILE,
 )
+from src.chunk_planner import plan_reads, read_header
+from src.products import GPCP
+from src.timeseries_store import append_to_store, domain_signature, plan_update
+
 
 def main():
-    gpcp_dir = RAW_DIR / "gpcp_monthly"
-    files = sorted(gpcp_dir.glob("gpcp_v02r03_monthly_*.nc"))
+    files = GPCP.list_files()
 
     if not files:
-        raise RuntimeError(f"No GPCP files found in {gpcp_dir}")
+        raise RuntimeError(f"No GPCP files found in {GPCP.raw_dir}")
 
     print(f"Found {len(files)} GPCP monthly files")
 
-    ds = xr.open_mfdataset(
-        files,
-        combine="by_coords",
-        data_vars="minimal",
-        coords="minimal",
-        compat="override"
+    # Only months missing from the processed store are read
+    month_files = GPCP.month_files()
+    pending = plan_update(GPCP_SUBSET_FILE, month_files, domain_signature())
+    if not pending:
+        print("Up to date:", GPCP_SUBSET_FILE.resolve())
+        return
+
+    print(f"Processing {len(pending)} new GPCP months")
+
+    header, subset = read_header(
+        month_files[pending[0]],
+        GPCP.variable,
+        bounds={
+            GPCP.lat_name: (LAT_MIN, LAT_MAX),
+            GPCP.lon_name: (LON_MIN, LON_MAX),
+        },
     )
+    plan = plan_reads("extract_gpcp", header, sizes={**subset, "time": len(pending)})
+
+    ds = GPCP.open_native([month_files[m] for m in pending])
 
     # Select precipitation
-    da = ds["precip"]
+    da = ds[GPCP.variable]
 
     # Time subset
     da = da.sel(time=slice(START_DATE, END_DATE))
@@ -42,18 +56,21 @@ def main():
     da = da.sel(
         latitude=slice(LAT_MIN, LAT_MAX),
         longitude=slice(LON_MIN, LON_MAX)
-    )
+    ).chunk(plan.chunks)
 
     # Convert to Dataset BEFORE dropping bounds
     out_ds = da.to_dataset(name="precip_mm_day")
 
     # Drop bounds if present
-    for v in ["time_bnds", "lat_bnds", "lon_bnds"]:
+    for v in GPCP.drop_vars:
         if v in out_ds.coords:
             out_ds = out_ds.drop_vars(v)
 
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-    out_ds.to_netcdf(GPCP_SUBSET_FILE)
+    with plan.scheduler():
+        append_to_store(
+            out_ds, GPCP_SUBSET_FILE, domain_signature(), time_block=plan.chunks["time"]
+        )
 
     print("Saved:", GPCP_SUBSET_FILE.resolve())
 
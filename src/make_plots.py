@@ -8,9 +8,9 @@ import xarray as xr
 
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
-from cartopy.io import shapereader
 
-from src.config import GPCP_SUBSET_FILE, PROCESSED_DIR
+from src.config import GPCP_SUBSET_FILE, GRIDCELL_METRICS_FILE, PROCESSED_DIR
+from src.region_mask import area_weights, country_mask, india_geometry, masked_area_mean
 
 
 PLOTS_DIR = Path("plots")
@@ -26,17 +26,6 @@ def _load_data():
     return imerg, gpcp
 
 
-def _india_geometry():
-    shp = shapereader.natural_earth(
-        resolution="50m", category="cultural", name="admin_0_countries"
-    )
-    reader = shapereader.Reader(shp)
-    for record in reader.records():
-        if record.attributes.get("ADMIN") == "India":
-            return record.geometry
-    raise RuntimeError("India geometry not found in Natural Earth dataset.")
-
-
 def _style_map_axis(ax, india_geom):
     ax.set_extent([LON_MIN, LON_MAX, LAT_MIN, LAT_MAX], crs=ccrs.PlateCarree())
     ax.add_feature(cfeature.LAND, facecolor="#f6f3ea", edgecolor="none", zorder=0)
@@ -157,8 +146,13 @@ def plot_bias_map(imerg, gpcp, india_geom):
 
 
 def plot_area_mean_timeseries(imerg, gpcp):
-    imerg_ts = imerg.mean(dim=("latitude", "longitude"))
-    gpcp_ts = gpcp.mean(dim=("latitude", "longitude"))
+    # Average over the India part of the box only, weighted by cell area.
+    # Same cached mask as the sanity check.
+    weights = area_weights(
+        country_mask(imerg["latitude"].values, imerg["longitude"].values, "India")
+    )
+    imerg_ts = masked_area_mean(imerg, weights)
+    gpcp_ts = masked_area_mean(gpcp, weights)
 
     fig, ax = plt.subplots(figsize=(11.5, 4.8), constrained_layout=True)
     ax.plot(
@@ -177,7 +171,7 @@ def plot_area_mean_timeseries(imerg, gpcp):
     )
 
     ax.set_title(
-        "Northern India Area-Averaged Monthly Precipitation (2019-2021)",
+        "Northern India Area-Averaged Monthly Precipitation (India cells, 2019-2021)",
         fontsize=11,
         weight="semibold",
     )
@@ -266,17 +260,68 @@ def plot_jjas_bias_map(imerg, gpcp, india_geom):
     print(f"Saved: {out_file}")
 
 
+def plot_metric_maps(metrics, india_geom):
+    panels = [
+        ("pearson_r", "Pearson r", "viridis", dict(vmin=0.0, vmax=1.0)),
+        ("relative_bias", "Relative Bias", "RdBu_r", dict(norm=TwoSlopeNorm(vmin=-1.0, vcenter=0.0, vmax=1.0))),
+        ("kge", "Kling-Gupta Efficiency", "viridis", dict(vmin=-0.5, vmax=1.0)),
+        ("wet_dry_agreement", "Wet/Dry Month Agreement", "YlGn", dict(vmin=0.5, vmax=1.0)),
+    ]
+
+    fig, axs = plt.subplots(
+        nrows=2,
+        ncols=2,
+        figsize=(14, 9.6),
+        subplot_kw={"projection": ccrs.PlateCarree()},
+        constrained_layout=True,
+    )
+
+    period = f"{metrics.attrs['time_start'][:4]}-{metrics.attrs['time_end'][:4]}"
+    for ax, (name, title, cmap, scale) in zip(axs.ravel(), panels):
+        field = metrics[name]
+        units = field.attrs.get("units", "1")
+        _style_map_axis(ax, india_geom)
+        mappable = ax.pcolormesh(
+            field["longitude"],
+            field["latitude"],
+            field,
+            transform=ccrs.PlateCarree(),
+            cmap=cmap,
+            shading="auto",
+            **scale,
+        )
+        ax.set_title(f"{title}: IMERG vs GPCP ({period})", fontsize=11, weight="semibold")
+
+        cbar = fig.colorbar(mappable, ax=ax, orientation="vertical", shrink=0.9, pad=0.03)
+        cbar.set_label(f"{title} ({'dimensionless' if units == '1' else units})", fontsize=10)
+        cbar.ax.tick_params(labelsize=9)
+
+    out_file = PLOTS_DIR / "gridcell_metrics_imerg_vs_gpcp.png"
+    fig.savefig(out_file, dpi=300, bbox_inches="tight")
+    plt.close(fig)
+    print(f"Saved: {out_file}")
+
+
 def main():
     PLOTS_DIR.mkdir(parents=True, exist_ok=True)
     imerg, gpcp = _load_data()
-    india_geom = _india_geometry()
+    india_geom = india_geometry()
 
     plot_mean_maps(imerg, gpcp, india_geom)
     plot_bias_map(imerg, gpcp, india_geom)
     plot_area_mean_timeseries(imerg, gpcp)
     plot_rmse_map(imerg, gpcp, india_geom)
     plot_jjas_bias_map(imerg, gpcp, india_geom)
-    print("Done: generated 5 plots in ./plots")
+    if not GRIDCELL_METRICS_FILE.exists():
+        print(
+            f"Skipping gridcell metric maps: {GRIDCELL_METRICS_FILE} not found "
+            "(run python -m src.compute_metrics first)."
+        )
+        print("Done: generated 5 plots in ./plots")
+        return
+    with xr.open_dataset(GRIDCELL_METRICS_FILE) as metrics:
+        plot_metric_maps(metrics, india_geom)
+    print("Done: generated 6 plots in ./plots")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,167 @@
+"""Product adapters describing how to read each precipitation product.
+
+An adapter declares where a product's monthly files live, how to read
+the precipitation variable, which coordinate conventions the files use and
+how to convert the values to mm/day. ``ProductAdapter.open`` returns the
+standardized form every comparison stage works with: a
+``(time, latitude, longitude)`` array in mm/day on ascending latitude and
+0..360 longitude, subset to the configured domain, with month-start times.
+
+New products (CHIRPS, ERA5, gauge grids, ...) are added by defining an
+adapter and registering it in ``PRODUCTS``.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+import xarray as xr
+
+from src.config import (
+    GPCP_SUBSET_FILE,
+    IMERG_MM_DAY_FILE,
+    IMERG_RAW_DIR,
+    LAT_MAX,
+    LAT_MIN,
+    LON_MAX,
+    LON_MIN,
+    RAW_DIR,
+)
+from src.timeseries_store import in_configured_period
+
+
+def _scale(factor: float) -> Callable[[xr.DataArray], xr.DataArray]:
+    def convert(da):
+        return da * factor
+
+    return convert
+
+
+@dataclass(frozen=True)
+class ProductAdapter:
+    """Reader, coordinate conventions and unit conversion for one product.
+
+    ``file_month_pattern`` must contain ``year`` and ``month`` named groups
+    matched against file names. ``to_mm_day`` converts the native variable
+    to mm/day. ``store`` is the pipeline's processed mm/day subset of the
+    product on its native grid, when the pipeline maintains one.
+    """
+
+    name: str
+    raw_dir: Path
+    file_glob: str
+    file_month_pattern: str
+    variable: str
+    lat_name: str
+    lon_name: str
+    to_mm_day: Callable[[xr.DataArray], xr.DataArray]
+    native_units: str
+    group: str | None = None
+    drop_vars: Tuple[str, ...] = field(default_factory=tuple)
+    store: Path | None = None
+    store_variable: str = "precip_mm_day"
+
+    def list_files(self) -> List[Path]:
+        return sorted(self.raw_dir.glob(self.file_glob))
+
+    def file_month(self, path: Path) -> str:
+        match = re.search(self.file_month_pattern, path.name)
+        if match is None:
+            raise ValueError(f"{self.name}: cannot parse month from {path.name}")
+        return f"{match['year']}-{match['month']}"
+
+    def month_files(self) -> Dict[str, Path]:
+        """Map ``YYYY-MM`` to file for months in the configured period.
+
+        When a month has several files, the last one in sorted order wins.
+        """
+        return {
+            self.file_month(f): f
+            for f in self.list_files()
+            if in_configured_period(self.file_month(f))
+        }
+
+    def open_native(self, files) -> xr.Dataset:
+        """Open ``files`` lazily on their on-disk chunking."""
+        return xr.open_mfdataset(
+            files,
+            engine="netcdf4",
+            group=self.group,
+            combine="by_coords",
+            data_vars="minimal",
+            coords="minimal",
+            compat="override",
+            chunks={},
+        )
+
+    def open(self, files, chunks=None) -> xr.DataArray:
+        """Open ``files`` in the standardized comparison form.
+
+        ``chunks`` (native dimension names) are applied after subsetting.
+        """
+        da = self.open_native(files)[self.variable]
+        da = self.standardize(self.to_mm_day(da))
+        if chunks:
+            names = {self.lat_name: "latitude", self.lon_name: "longitude"}
+            da = da.chunk({names.get(dim, dim): n for dim, n in chunks.items()})
+        return da
+
+    def open_store(self, chunks=None) -> xr.DataArray:
+        """Open the processed store in the standardized comparison form."""
+        ds = xr.open_dataset(self.store, chunks=chunks)
+        return self.standardize(ds[self.store_variable])
+
+    def standardize(self, da: xr.DataArray) -> xr.DataArray:
+        """Rename, reorder and subset an mm/day array in native conventions."""
+        da = da.drop_vars([v for v in self.drop_vars if v in da.coords])
+        da = da.rename({self.lat_name: "latitude", self.lon_name: "longitude"})
+
+        if float(da["longitude"].min()) < 0:
+            da = da.assign_coords(longitude=da["longitude"] % 360)
+        da = da.sortby("latitude").sortby("longitude")
+        da = da.sel(
+            latitude=slice(LAT_MIN, LAT_MAX),
+            longitude=slice(LON_MIN % 360, LON_MAX % 360),
+        )
+
+        months = pd.to_datetime([str(t)[:7] for t in da["time"].values])
+        da = da.assign_coords(time=months)
+        da = da.transpose("time", "latitude", "longitude")
+        da.name = self.name
+        da.attrs = {"units": "mm/day", "source_units": self.native_units}
+        return da
+
+
+IMERG = ProductAdapter(
+    name="imerg",
+    raw_dir=IMERG_RAW_DIR,
+    file_glob="3B-MO.MS.MRG.3IMERG.*.HDF5",
+    file_month_pattern=r"3IMERG\.(?P<year>\d{4})(?P<month>\d{2})\d{2}-",
+    variable="precipitation",
+    group="Grid",
+    lat_name="lat",
+    lon_name="lon",
+    to_mm_day=_scale(24.0),
+    native_units="mm/hr",
+    store=IMERG_MM_DAY_FILE,
+)
+
+GPCP = ProductAdapter(
+    name="gpcp",
+    raw_dir=RAW_DIR / "gpcp_monthly",
+    file_glob="gpcp_v02r03_monthly_*.nc",
+    file_month_pattern=r"_d(?P<year>\d{4})(?P<month>\d{2})_",
+    variable="precip",
+    lat_name="latitude",
+    lon_name="longitude",
+    to_mm_day=_scale(1.0),
+    native_units="mm/day",
+    drop_vars=("time_bnds", "lat_bnds", "lon_bnds"),
+    store=GPCP_SUBSET_FILE,
+)
+
+PRODUCTS: Dict[str, ProductAdapter] = {adapter.name: adapter for adapter in [IMERG, GPCP]}
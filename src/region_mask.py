@@ -0,0 +1,150 @@
+"""Fractional region masks on analysis grids and masked area means.
+
+A region polygon is rasterized once per grid to the fraction of each cell
+it covers (by sub-sampling every cell) and cached on disk keyed by the
+grid coordinates and the polygon geometry. Area means then reduce to one
+weighted dot product with weights ``fraction * cos(latitude)``, applied to
+all time steps at once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import shapely
+import xarray as xr
+from cartopy.io import shapereader
+
+from src.config import REGION_MASK_DIR
+
+SUBSAMPLES = 10
+
+
+def country_geometry(name: str = "India"):
+    """Return a Natural Earth (50m) country polygon by its ``ADMIN`` name."""
+    shp = shapereader.natural_earth(
+        resolution="50m", category="cultural", name="admin_0_countries"
+    )
+    reader = shapereader.Reader(shp)
+    for record in reader.records():
+        if record.attributes.get("ADMIN") == name:
+            return record.geometry
+    raise RuntimeError(f"{name} geometry not found in Natural Earth dataset.")
+
+
+def india_geometry():
+    return country_geometry("India")
+
+
+def cell_edges(centers: np.ndarray) -> np.ndarray:
+    """Cell edges of a regular 1-D grid from its cell centres."""
+    centers = np.asarray(centers, dtype=np.float64)
+    if centers.size == 1:
+        raise ValueError("Cannot infer cell edges from a single coordinate.")
+    mid = 0.5 * (centers[1:] + centers[:-1])
+    first = centers[0] - (mid[0] - centers[0])
+    last = centers[-1] + (centers[-1] - mid[-1])
+    return np.concatenate([[first], mid, [last]])
+
+
+def _subsample(edges: np.ndarray, n: int) -> np.ndarray:
+    """Return ``(cells, n)`` evenly spaced sub-cell centres."""
+    offsets = (np.arange(n) + 0.5) / n
+    return edges[:-1, None] + (edges[1:] - edges[:-1])[:, None] * offsets
+
+
+def fractional_coverage(lat, lon, geometry, *, subsamples: int = SUBSAMPLES) -> np.ndarray:
+    """Fraction of each ``(lat, lon)`` cell covered by ``geometry``.
+
+    Grid longitudes may use 0..360; samples are wrapped to -180..180 to
+    match Natural Earth polygons.
+    """
+    sub_lat = _subsample(cell_edges(lat), subsamples)
+    sub_lon = _subsample(cell_edges(lon), subsamples)
+    sub_lon = (sub_lon + 180.0) % 360.0 - 180.0
+
+    y = sub_lat[:, None, :, None]
+    x = sub_lon[None, :, None, :]
+    y, x = np.broadcast_arrays(y, x)
+    inside = shapely.contains_xy(geometry, x, y)
+    return inside.mean(axis=(2, 3))
+
+
+def _cached_mask(lat, lon, key_parts, build, *, prefix, cache_dir: Path) -> xr.DataArray:
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    digest = hashlib.sha1()
+    for part in (lat.tobytes(), lon.tobytes(), *key_parts):
+        digest.update(part)
+    cache_file = cache_dir / f"{prefix}_{digest.hexdigest()[:16]}.npy"
+
+    if cache_file.exists():
+        fraction = np.load(cache_file)
+    else:
+        fraction = build(lat, lon)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        np.save(cache_file, fraction)
+
+    return xr.DataArray(
+        fraction,
+        coords={"latitude": lat, "longitude": lon},
+        dims=("latitude", "longitude"),
+        name="region_fraction",
+    )
+
+
+def region_mask(
+    lat,
+    lon,
+    geometry,
+    *,
+    subsamples: int = SUBSAMPLES,
+    cache_dir: Path = REGION_MASK_DIR,
+) -> xr.DataArray:
+    """Load or build the cached fractional mask of ``geometry`` on a grid."""
+    return _cached_mask(
+        lat,
+        lon,
+        (shapely.to_wkb(geometry), str(subsamples).encode()),
+        lambda y, x: fractional_coverage(y, x, geometry, subsamples=subsamples),
+        prefix="mask",
+        cache_dir=cache_dir,
+    )
+
+
+def country_mask(
+    lat,
+    lon,
+    name: str = "India",
+    *,
+    subsamples: int = SUBSAMPLES,
+    cache_dir: Path = REGION_MASK_DIR,
+) -> xr.DataArray:
+    """Cached fractional mask of a Natural Earth country on a grid.
+
+    The cache is keyed by country name and grid, so a cache hit never loads
+    the shapefile and works offline once the mask has been built.
+    """
+    return _cached_mask(
+        lat,
+        lon,
+        (name.encode(), str(subsamples).encode()),
+        lambda y, x: fractional_coverage(y, x, country_geometry(name), subsamples=subsamples),
+        prefix=f"country_{name.lower().replace(' ', '_')}",
+        cache_dir=cache_dir,
+    )
+
+
+def area_weights(mask: xr.DataArray) -> xr.DataArray:
+    """Combine mask fraction with ``cos(latitude)`` cell-area weighting."""
+    return mask * np.cos(np.deg2rad(mask["latitude"]))
+
+
+def masked_area_mean(da: xr.DataArray, weights: xr.DataArray) -> xr.DataArray:
+    """Weighted spatial mean for every time step; NaN cells are skipped."""
+    dims = ("latitude", "longitude")
+    num = xr.dot(da.fillna(0.0), weights, dim=dims)
+    den = xr.dot(da.notnull(), weights, dim=dims)
+    return num / den
@@ -1,56 +1,67 @@
 # src/regrid_imerg_to_gpcp.py
 
+import numpy as np
 import xarray as xr
 
 from src.config import (
-    PROCESSED_DIR,
     IMERG_MM_DAY_FILE,
+    IMERG_REGRID_FILE,
     GPCP_SUBSET_FILE,
 )
+from src.chunk_planner import plan_reads, read_header
+from src.products import IMERG
+from src.regridding import regrid_to_target
+from src.timeseries_store import (
+    append_to_store,
+    domain_signature,
+    month_keys,
+    plan_update,
+    select_months,
+)
 
 
 def main():
-    # Load datasets
-    imerg = xr.open_dataset(IMERG_MM_DAY_FILE)
+    # Load datasets; interpolation needs whole spatial fields, so only
+    # time is chunked.
+    header, _ = read_header(IMERG_MM_DAY_FILE, IMERG.store_variable)
+    plan = plan_reads("regrid_imerg_to_gpcp", header, splittable=("time",))
+    imerg = xr.open_dataset(IMERG_MM_DAY_FILE, chunks=plan.chunks)
     gpcp = xr.open_dataset(GPCP_SUBSET_FILE)
 
-    da = imerg["precip_mm_day"]
-
-    # Standardize IMERG dimension names to match GPCP coordinate names.
-    rename_map = {}
-    if "lat" in da.dims:
-        rename_map["lat"] = "latitude"
-    if "lon" in da.dims:
-        rename_map["lon"] = "longitude"
-    if rename_map:
-        da = da.rename(rename_map)
-
-    # Convert longitude from -180..180 to 0..360 when needed.
-    if float(da["longitude"].min()) < 0:
-        da = da.assign_coords(
-            longitude=(da["longitude"] % 360)
-        ).sortby("longitude")
-
-    # Interpolate IMERG onto GPCP grid
-    imerg_interp = da.interp(
-        latitude=gpcp["latitude"],
-        longitude=gpcp["longitude"],
-        method="linear",
+    out_file = IMERG_REGRID_FILE
+
+    # Only months missing from the regridded store are interpolated
+    pending = plan_update(
+        out_file, month_keys(imerg["time"].values), domain_signature()
     )
-    if imerg_interp.sizes.get("time") == gpcp.sizes.get("time"):
-        imerg_interp = imerg_interp.assign_coords(time=gpcp["time"].values)
-    imerg_interp = imerg_interp.transpose("time", "latitude", "longitude")
+    if not pending:
+        print("Up to date:", out_file.resolve())
+        return
+
+    da = IMERG.standardize(select_months(imerg[IMERG.store_variable], pending))
+    gpcp_time = select_months(gpcp["time"], pending)
+
+    # Interpolate IMERG onto GPCP grid with the shared cached bilinear weights
+    with plan.scheduler():
+        imerg_interp = regrid_to_target(
+            da,
+            gpcp["latitude"].values,
+            gpcp["longitude"].values,
+            time_block=plan.chunks["time"],
+        ).astype(np.float32)
+    if imerg_interp.sizes.get("time") == gpcp_time.sizes.get("time"):
+        imerg_interp = imerg_interp.assign_coords(time=gpcp_time.values)
 
     # Save output
     out = imerg_interp.to_dataset(name="imerg_precip_mm_day")
     out.attrs["note"] = (
         "IMERG monthly precipitation (mm/day) "
-        "regridded to GPCP 2.5 degree grid using xarray.interp"
+        "regridded to GPCP 2.5 degree grid with cached bilinear weights"
     )
 
-    out_file = PROCESSED_DIR / "imerg_north_india_on_gpcp_grid.nc"
-    out.to_netcdf(out_file)
-
+    append_to_store(
+        out, out_file, domain_signature(), time_block=plan.chunks["time"]
+    )
     print("Regridding complete")
     print("Saved:", out_file.resolve())
 
@@ -0,0 +1,103 @@
+"""Shared bilinear regridding with cached separable weights.
+
+Weights are 1-D latitude and longitude interpolation matrices (matching
+``xarray.interp(method="linear")``), cached on disk keyed by source and
+target grid so every stage and product sharing a grid reuses them across
+runs. Both the IMERG regrid stage and the multi-product comparison
+regrid through ``regrid_to_target``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import xarray as xr
+
+from src.config import REGRID_WEIGHTS_DIR, TIME_BLOCK
+
+
+def linear_weights(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Return the ``(len(dst), len(src))`` 1-D linear interpolation matrix.
+
+    ``src`` must be ascending. Rows for ``dst`` points outside ``src`` are
+    NaN so they propagate as missing, like ``xarray.interp``.
+    """
+    src = np.asarray(src, dtype=np.float64)
+    dst = np.asarray(dst, dtype=np.float64)
+    weights = np.zeros((dst.size, src.size))
+    if src.size == 1:
+        weights[dst == src[0], 0] = 1.0
+        weights[dst != src[0]] = np.nan
+        return weights
+
+    idx = np.clip(np.searchsorted(src, dst, side="right") - 1, 0, src.size - 2)
+    frac = (dst - src[idx]) / (src[idx + 1] - src[idx])
+    rows = np.arange(dst.size)
+    weights[rows, idx] = 1.0 - frac
+    weights[rows, idx + 1] = frac
+    weights[(dst < src[0]) | (dst > src[-1])] = np.nan
+    return weights
+
+
+def regrid_weights(
+    src_lat: np.ndarray,
+    src_lon: np.ndarray,
+    dst_lat: np.ndarray,
+    dst_lon: np.ndarray,
+    *,
+    cache_dir: Path = REGRID_WEIGHTS_DIR,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Load or build the cached latitude and longitude weight matrices."""
+    grids = [np.asarray(a, dtype=np.float64) for a in (src_lat, src_lon, dst_lat, dst_lon)]
+    key = hashlib.sha1(b"linear" + b"".join(g.tobytes() for g in grids)).hexdigest()[:16]
+    cache_file = cache_dir / f"linear_{key}.npz"
+    if cache_file.exists():
+        with np.load(cache_file) as cached:
+            return cached["wlat"], cached["wlon"]
+
+    wlat = linear_weights(grids[0], grids[2])
+    wlon = linear_weights(grids[1], grids[3])
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    np.savez(cache_file, wlat=wlat, wlon=wlon)
+    return wlat, wlon
+
+
+def apply_weights(data: np.ndarray, wlat: np.ndarray, wlon: np.ndarray) -> np.ndarray:
+    """Interpolate a ``(time, lat, lon)`` block; NaN inputs poison their targets."""
+    valid = np.isfinite(data)
+    filled = np.where(valid, data, 0.0)
+    out = wlat @ filled @ wlon.T
+    coverage = wlat @ valid.astype(np.float64) @ wlon.T
+    return np.where(np.isclose(coverage, 1.0), out, np.nan)
+
+
+def regrid_to_target(
+    da: xr.DataArray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    *,
+    time_block: int = TIME_BLOCK,
+) -> xr.DataArray:
+    """Regrid a standardized product onto ``(lat, lon)`` block by block."""
+    same_grid = np.array_equal(da["latitude"].values, lat) and np.array_equal(
+        da["longitude"].values, lon
+    )
+    if same_grid:
+        return da.load()
+
+    wlat, wlon = regrid_weights(da["latitude"].values, da["longitude"].values, lat, lon)
+    out = np.empty((da.sizes["time"], lat.size, lon.size))
+    for start in range(0, da.sizes["time"], time_block):
+        block = np.asarray(da.isel(time=slice(start, start + time_block)).values, dtype=np.float64)
+        out[start:start + block.shape[0]] = apply_weights(block, wlat, wlon)
+
+    return xr.DataArray(
+        out,
+        coords={"time": da["time"].values, "latitude": lat, "longitude": lon},
+        dims=("time", "latitude", "longitude"),
+        name=da.name,
+        attrs=da.attrs,
+    )
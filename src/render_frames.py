@@ -0,0 +1,199 @@
+"""Batch rendering of monthly IMERG, GPCP and bias map sequences.
+
+Each worker process builds the styled cartopy axes, colorbar and
+``pcolormesh`` once, then only swaps the mesh data and title per month
+before saving. Frames can be encoded into an animated GIF (Pillow) or MP4
+(``ffmpeg`` on ``PATH``).
+"""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+import matplotlib.pyplot as plt
+from matplotlib.colors import Normalize, TwoSlopeNorm
+import numpy as np
+
+import cartopy.crs as ccrs
+
+from src.config import N_WORKERS
+from src.make_plots import PLOTS_DIR, _load_data, _style_map_axis
+from src.region_mask import india_geometry
+
+
+FRAMES_DIR = PLOTS_DIR / "monthly"
+FRAME_DPI = 150
+FRAME_KINDS = {
+    "imerg": ("IMERG Precipitation", "YlGnBu", "Precipitation (mm/day)"),
+    "gpcp": ("GPCP Precipitation", "YlGnBu", "Precipitation (mm/day)"),
+    "bias": ("Bias: IMERG - GPCP", "RdBu_r", "Bias (mm/day)"),
+}
+
+
+def _frame_fields(imerg, gpcp):
+    """Return the (time, lat, lon) field and a record-wide norm per kind."""
+    bias = imerg - gpcp
+
+    vmax = float(np.nanpercentile(np.concatenate([imerg.values.ravel(), gpcp.values.ravel()]), 98))
+    vmax = max(vmax, 1.0)
+    bias_vmax = max(float(np.nanpercentile(np.abs(bias.values), 98)), 0.5)
+
+    return {
+        "imerg": (imerg, Normalize(vmin=0.0, vmax=vmax)),
+        "gpcp": (gpcp, Normalize(vmin=0.0, vmax=vmax)),
+        "bias": (bias, TwoSlopeNorm(vmin=-bias_vmax, vcenter=0.0, vmax=bias_vmax)),
+    }
+
+
+def _render_chunk(kind, lon, lat, values, labels, out_paths, norm, india_geom, dpi):
+    title, cmap, cbar_label = FRAME_KINDS[kind]
+
+    fig, ax = plt.subplots(
+        nrows=1,
+        ncols=1,
+        figsize=(9.2, 5.4),
+        subplot_kw={"projection": ccrs.PlateCarree()},
+        constrained_layout=True,
+    )
+    _style_map_axis(ax, india_geom)
+
+    mesh = ax.pcolormesh(
+        lon,
+        lat,
+        values[0],
+        transform=ccrs.PlateCarree(),
+        cmap=cmap,
+        norm=norm,
+        shading="auto",
+    )
+    title_text = ax.set_title(f"{title} ({labels[0]})", fontsize=11, weight="semibold")
+
+    cbar = fig.colorbar(mesh, ax=ax, orientation="vertical", shrink=0.9, pad=0.03)
+    cbar.set_label(cbar_label, fontsize=10)
+    cbar.ax.tick_params(labelsize=9)
+
+    # Solve the layout once; every frame shares the same geometry.
+    fig.canvas.draw()
+    fig.set_layout_engine("none")
+
+    for field, label, out_file in zip(values, labels, out_paths):
+        mesh.set_array(field)
+        title_text.set_text(f"{title} ({label})")
+        fig.savefig(out_file, dpi=dpi)
+
+    plt.close(fig)
+    return len(out_paths)
+
+
+def render_monthly_maps(
+    imerg,
+    gpcp,
+    india_geom,
+    *,
+    kinds=tuple(FRAME_KINDS),
+    out_dir: Path = FRAMES_DIR,
+    workers: int = N_WORKERS,
+    dpi: int = FRAME_DPI,
+) -> Dict[str, List[Path]]:
+    """Render one PNG per month for each of ``kinds``.
+
+    Months are split into contiguous blocks, one per worker, so each worker
+    pays the figure setup cost only once per kind.
+    """
+    fields = _frame_fields(imerg, gpcp)
+    labels = [str(t)[:7] for t in imerg["time"].values]
+
+    jobs = []
+    frames: Dict[str, List[Path]] = {}
+    for kind in kinds:
+        field, norm = fields[kind]
+        kind_dir = out_dir / kind
+        kind_dir.mkdir(parents=True, exist_ok=True)
+        frames[kind] = [kind_dir / f"{kind}_{label}.png" for label in labels]
+
+        values = field.transpose("time", "latitude", "longitude").values
+        for block in np.array_split(np.arange(len(labels)), min(workers, len(labels))):
+            if block.size == 0:
+                continue
+            jobs.append(
+                (
+                    kind,
+                    field["longitude"].values,
+                    field["latitude"].values,
+                    values[block],
+                    [labels[i] for i in block],
+                    [frames[kind][i] for i in block],
+                    norm,
+                    india_geom,
+                    dpi,
+                )
+            )
+
+    if workers == 1:
+        for job in jobs:
+            _render_chunk(*job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(_render_chunk, *job) for job in jobs]:
+                future.result()
+
+    return frames
+
+
+def encode_animation(frame_paths: List[Path], out_file: Path, fps: int = 4) -> Path:
+    """Encode frames into an animated GIF or MP4, chosen by ``out_file`` suffix."""
+    if not frame_paths:
+        raise ValueError("No frames to encode.")
+
+    suffix = out_file.suffix.lower()
+    if suffix == ".gif":
+        from PIL import Image
+
+        images = [Image.open(p).convert("RGB") for p in frame_paths]
+        images[0].save(
+            out_file,
+            save_all=True,
+            append_images=images[1:],
+            duration=int(1000 / fps),
+            loop=0,
+        )
+    elif suffix == ".mp4":
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("MP4 encoding requires ffmpeg on PATH; use a .gif output instead.")
+        cmd = [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "image2pipe", "-framerate", str(fps), "-i", "-",
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p",
+            str(out_file),
+        ]
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        for p in frame_paths:
+            proc.stdin.write(Path(p).read_bytes())
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to encode {out_file}")
+    else:
+        raise ValueError(f"Unsupported animation format: {out_file.suffix}")
+
+    return out_file
+
+
+def main():
+    imerg, gpcp = _load_data()
+    india_geom = india_geometry()
+
+    frames = render_monthly_maps(imerg, gpcp, india_geom)
+    for kind, paths in frames.items():
+        print(f"Saved {len(paths)} {kind} frames in {paths[0].parent}")
+        out_file = encode_animation(paths, PLOTS_DIR / f"monthly_{kind}.gif")
+        print(f"Saved: {out_file}")
+
+
+if __name__ == "__main__":
+    main()
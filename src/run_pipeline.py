@@ -1,3 +1,6 @@
+import argparse
+import time
+
 from src.download_imerg import main as download_imerg_main
 from src.download_gpcp import main as download_gpcp_main
 from src.concatenate_imerg import main as concatenate_imerg_main
@@ -5,32 +8,70 @@ from src.unit_convert_imerg import main as unit_convert_imerg_main
 from src.extract_gpcp import main as extract_gpcp_main
 from src.regrid_imerg_to_gpcp import main as regrid_main
 from src.sanity_check_regrid import main as sanity_check_main
+from src.compute_metrics import main as compute_metrics_main
+from src.compare_products import main as compare_products_main
+from src.build_pyramid import main as build_pyramid_main
+from src.cost_estimate import estimate_pipeline, format_report, record_run
+
+
+def _run_stage(timings, stage, func):
+    start = time.perf_counter()
+    func()
+    timings[stage] = time.perf_counter() - start
 
 
-def main():
-    print("[1/7] Verifying IMERG monthly files...")
+def main(dry_run=False):
+    if dry_run:
+        start = time.perf_counter()
+        print(format_report(estimate_pipeline()))
+        print(f"Dry run: estimated in {time.perf_counter() - start:.2f} s, nothing executed.")
+        return
+
+    print("[1/10] Verifying IMERG monthly files...")
     download_imerg_main()
 
-    print("[2/7] Verifying GPCP monthly files...")
+    print("[2/10] Verifying GPCP monthly files...")
     download_gpcp_main()
 
-    print("[3/7] Concatenating IMERG monthly files...")
-    concatenate_imerg_main()
+    # Estimated work per stage is recorded with the measured timings to
+    # calibrate later dry runs.
+    estimates = estimate_pipeline()
+    timings = {}
+
+    print("[3/10] Concatenating IMERG monthly files...")
+    _run_stage(timings, "concatenate_imerg", concatenate_imerg_main)
+
+    print("[4/10] Converting IMERG units to mm/day...")
+    _run_stage(timings, "unit_convert_imerg", unit_convert_imerg_main)
+
+    print("[5/10] Extracting GPCP subset...")
+    _run_stage(timings, "extract_gpcp", extract_gpcp_main)
+
+    print("[6/10] Regridding IMERG to GPCP grid...")
+    _run_stage(timings, "regrid_imerg_to_gpcp", regrid_main)
+
+    print("[7/10] Running sanity checks...")
+    _run_stage(timings, "sanity_check_regrid", sanity_check_main)
 
-    print("[4/7] Converting IMERG units to mm/day...")
-    unit_convert_imerg_main()
+    print("[8/10] Computing per-gridcell metrics...")
+    _run_stage(timings, "compute_metrics", compute_metrics_main)
 
-    print("[5/7] Extracting GPCP subset...")
-    extract_gpcp_main()
+    print("[9/10] Comparing configured products on a common grid...")
+    _run_stage(timings, "compare_products", compare_products_main)
 
-    print("[6/7] Regridding IMERG to GPCP grid...")
-    regrid_main()
+    print("[10/10] Building IMERG multi-resolution pyramid...")
+    _run_stage(timings, "build_pyramid", build_pyramid_main)
 
-    print("[7/7] Running sanity checks...")
-    sanity_check_main()
+    record_run(estimates, timings)
 
     print("Pipeline completed successfully.")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Run the IMERG vs GPCP pipeline.")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="report estimated files, bytes, memory and wall time without running",
+    )
+    main(dry_run=parser.parse_args().dry_run)
@@ -1,18 +1,42 @@
 import json
+import math
 from pathlib import Path
 
 import numpy as np
 import xarray as xr
 
+from src.chunk_planner import plan_reads, read_header
 from src.config import GPCP_SUBSET_FILE, PROCESSED_DIR
+from src.export_tables import export_area_means
+from src.region_mask import area_weights, country_mask, masked_area_mean
+
+
+def _area_mean_metrics(im_m, gp_m):
+    diff = im_m - gp_m
+    return {
+        "bias_mm_day_imerg_minus_gpcp": float(diff.mean().values),
+        "mae_mm_day": float(np.abs(diff).mean().values),
+        "rmse_mm_day": float(np.sqrt((diff**2).mean().values)),
+        "pearson_r": float(np.corrcoef(im_m.values, gp_m.values)[0, 1]),
+    }
 
 
 def main():
     imerg_regridded_file = PROCESSED_DIR / "imerg_north_india_on_gpcp_grid.nc"
     report_file = PROCESSED_DIR / "regrid_sanity_check_report.json"
 
-    im = xr.open_dataset(imerg_regridded_file)["imerg_precip_mm_day"]
-    gp = xr.open_dataset(GPCP_SUBSET_FILE)["precip_mm_day"]
+    # Value checks materialize both full arrays.
+    header, _ = read_header(imerg_regridded_file, "imerg_precip_mm_day")
+    full_bytes = math.prod(header.shape) * header.itemsize
+    plan = plan_reads(
+        "sanity_check_regrid",
+        header,
+        splittable=("time",),
+        resident_bytes=2 * full_bytes,
+    )
+
+    im = xr.open_dataset(imerg_regridded_file, chunks=plan.chunks)["imerg_precip_mm_day"]
+    gp = xr.open_dataset(GPCP_SUBSET_FILE, chunks=plan.chunks)["precip_mm_day"]
 
     # Force shared time dtype/values for stable alignment and comparison.
     if im.sizes["time"] == gp.sizes["time"]:
@@ -20,11 +44,36 @@ def main():
 
     im_a, gp_a = xr.align(im, gp, join="inner")
 
+    # Read each input once; every check below works on the loaded arrays.
+    with plan.scheduler():
+        im_a = im_a.load()
+        gp_a = gp_a.load()
+
     im_m = im_a.mean(dim=("latitude", "longitude"))
     gp_m = gp_a.mean(dim=("latitude", "longitude"))
-    diff = im_m - gp_m
+
+    # Area means over India cells only, weighted by mask fraction and cos(lat).
+    # Without a cached mask and no Natural Earth access, the India section
+    # is left null rather than filled with box values.
+    series = {"box": (im_m, gp_m)}
+    india_metrics = None
+    try:
+        weights = area_weights(
+            country_mask(im_a["latitude"].values, im_a["longitude"].values, "India")
+        )
+    except OSError as exc:
+        print(f"WARNING: India mask unavailable ({exc}); skipping India area means.")
+    else:
+        im_w = masked_area_mean(im_a, weights)
+        gp_w = masked_area_mean(gp_a, weights)
+        series["india"] = (im_w, gp_w)
+        india_metrics = _area_mean_metrics(im_w, gp_w)
+
+    # Full monthly series go to the columnar tables; the report keeps a preview.
+    run_id = export_area_means(series)
 
     results = {
+        "run_id": run_id,
         "files": {
             "imerg_regridded": str(imerg_regridded_file),
             "gpcp_subset": str(GPCP_SUBSET_FILE),
@@ -54,12 +103,9 @@ def main():
                 "nan_count": int(np.isnan(gp_a.values).sum()),
             },
         },
-        "monthly_spatial_mean_metrics": {
-            "bias_mm_day_imerg_minus_gpcp": float(diff.mean().values),
-            "mae_mm_day": float(np.abs(diff).mean().values),
-            "rmse_mm_day": float(np.sqrt((diff**2).mean().values)),
-            "pearson_r": float(np.corrcoef(im_m.values, gp_m.values)[0, 1]),
-        },
+        "monthly_spatial_mean_metrics": _area_mean_metrics(im_m, gp_m),
+        "india_mask_available": india_metrics is not None,
+        "india_masked_area_mean_metrics": india_metrics,
     }
 
     first5 = []
@@ -0,0 +1,184 @@
+"""Appendable NetCDF time-series store for the processed artifacts.
+
+Processed files are written with an unlimited ``time`` dimension, so a
+monthly update only processes the months that are not stored yet and
+appends them in place instead of rewriting the whole record. Each store
+records the domain it was built for; a store built for a different domain
+(or one that can no longer be extended in time order) is rebuilt.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List, Set, Tuple
+
+import netCDF4
+import numpy as np
+import pandas as pd
+import xarray as xr
+from xarray.coding.times import encode_cf_datetime
+
+from src.config import (
+    END_DATE,
+    GPCP_SUBSET_FILE,
+    IMERG_CONCAT_FILE,
+    IMERG_MM_DAY_FILE,
+    IMERG_REGRID_FILE,
+    LAT_MAX,
+    LAT_MIN,
+    LON_MAX,
+    LON_MIN,
+    START_DATE,
+)
+
+SIGNATURE_ATTR = "store_signature"
+
+
+def domain_signature() -> str:
+    return f"lat={LAT_MIN}:{LAT_MAX};lon={LON_MIN}:{LON_MAX}"
+
+
+def month_key(value) -> str:
+    """Return the ``YYYY-MM`` key of a timestamp-like value."""
+    return str(value)[:7]
+
+
+def month_keys(times: Iterable) -> List[str]:
+    return [month_key(t) for t in np.asarray(times)]
+
+
+def in_configured_period(month: str) -> bool:
+    return START_DATE[:7] <= month <= END_DATE[:7]
+
+
+def select_months(ds, months: Iterable[str]):
+    """Select the time steps of ``ds`` whose month key is in ``months``."""
+    wanted = set(months)
+    keep = [key in wanted for key in month_keys(ds["time"].values)]
+    return ds.isel(time=np.flatnonzero(keep))
+
+
+def _has_group(path: Path, group: str | None) -> bool:
+    if group is None:
+        return path.exists()
+    if not path.exists():
+        return False
+    with netCDF4.Dataset(path) as nc:
+        return group in nc.groups
+
+
+def stored_months(path: Path, signature: str, group: str | None = None) -> Set[str] | None:
+    """Months held by the store at ``path`` (or its ``group``), or None if
+    missing/incompatible."""
+    if not _has_group(path, group):
+        return None
+    with xr.open_dataset(path, group=group) as ds:
+        if ds.attrs.get(SIGNATURE_ATTR) != signature:
+            return None
+        return set(month_keys(ds["time"].values))
+
+
+def pending_months(
+    path: Path, months: Iterable[str], signature: str, group: str | None = None
+) -> Tuple[List[str], bool]:
+    """Return ``(pending, rebuild)`` for bringing ``path`` up to ``months``.
+
+    ``rebuild`` is True when the existing store cannot be extended by
+    appending (different domain, months outside the requested set, or new
+    months earlier than the stored record); every month is then pending.
+    A ``group`` not yet present in the file is simply empty. Nothing is
+    modified.
+    """
+    wanted = sorted(set(months))
+    stored = stored_months(path, signature, group)
+    if stored is not None:
+        pending = [m for m in wanted if m not in stored]
+        extendable = stored <= set(wanted) and (
+            not pending or pending[0] > max(stored)
+        )
+        if extendable:
+            return pending, False
+    return wanted, _has_group(path, group)
+
+
+def plan_update(path: Path, months: Iterable[str], signature: str) -> List[str]:
+    """Return the months that still have to be processed into ``path``,
+    removing the store first when it has to be rebuilt."""
+    pending, rebuild = pending_months(path, months, signature)
+    if rebuild:
+        print(f"Rebuilding store: {path}")
+        path.unlink()
+    return pending
+
+
+def append_to_store(
+    ds: xr.Dataset,
+    path: Path,
+    signature: str,
+    *,
+    time_block: int | None = None,
+    group: str | None = None,
+) -> None:
+    """Append the time steps of ``ds`` to the store at ``path``.
+
+    The first write creates the file (or ``group`` within it) with an
+    unlimited ``time`` dimension; later writes extend that dimension in
+    place, loading at most ``time_block`` time steps of ``ds`` at once.
+    """
+    if ds.sizes.get("time", 0) == 0:
+        return
+
+    if not _has_group(path, group):
+        ds = ds.copy()
+        ds.attrs[SIGNATURE_ATTR] = signature
+        path.parent.mkdir(parents=True, exist_ok=True)
+        ds.to_netcdf(
+            path,
+            mode="a" if path.exists() else "w",
+            group=group,
+            unlimited_dims=["time"],
+        )
+        return
+
+    with netCDF4.Dataset(path, mode="a") as root:
+        nc = root[group] if group else root
+        time_var = nc.variables["time"]
+        start = len(time_var)
+        stop = start + ds.sizes["time"]
+        encoded, _, _ = encode_cf_datetime(
+            ds["time"].values,
+            units=time_var.units,
+            calendar=getattr(time_var, "calendar", "standard"),
+        )
+        time_var[start:stop] = encoded
+
+        block = time_block or ds.sizes["time"]
+        for name, da in ds.data_vars.items():
+            if "time" not in da.dims:
+                continue
+            var = nc.variables[name]
+            da = da.transpose(*var.dimensions)
+            for offset in range(0, ds.sizes["time"], block):
+                part = da.isel(time=slice(offset, offset + block))
+                index = tuple(
+                    slice(start + offset, start + offset + part.sizes["time"])
+                    if dim == "time"
+                    else slice(None)
+                    for dim in var.dimensions
+                )
+                var[index] = part.values
+
+
+def main():
+    wanted = month_keys(pd.date_range(START_DATE, END_DATE, freq="MS"))
+    for path in [IMERG_CONCAT_FILE, IMERG_MM_DAY_FILE, GPCP_SUBSET_FILE, IMERG_REGRID_FILE]:
+        months = stored_months(path, domain_signature())
+        if months is None:
+            print(f"{path.name}: no compatible store")
+            continue
+        missing = [m for m in wanted if m not in months]
+        print(f"{path.name}: {len(months)} months stored, {len(missing)} missing")
+
+
+if __name__ == "__main__":
+    main()
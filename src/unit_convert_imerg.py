@@ -16,18 +16,41 @@ from src.config import (
     IMERG_MM_DAY_FILE,
     GPCP_SUBSET_FILE,
 )
+from src.chunk_planner import plan_reads, read_header
+from src.products import IMERG
+from src.timeseries_store import (
+    append_to_store,
+    domain_signature,
+    month_keys,
+    plan_update,
+    select_months,
+)
 
 
 
 def main():
-    ds = xr.open_dataset(IMERG_CONCAT_FILE)
-
-    pr_mm_day = ds["precip_mm_hr"] * 24.0
+    header, _ = read_header(IMERG_CONCAT_FILE, "precip_mm_hr")
+    plan = plan_reads("unit_convert_imerg", header)
+    ds = xr.open_dataset(IMERG_CONCAT_FILE, chunks=plan.chunks)
+
+    # Only months missing from the mm/day store are converted
+    pending = plan_update(
+        IMERG_MM_DAY_FILE, month_keys(ds["time"].values), domain_signature()
+    )
+    if not pending:
+        print("Up to date:", IMERG_MM_DAY_FILE)
+        return
+    ds = select_months(ds, pending)
+
+    pr_mm_day = IMERG.to_mm_day(ds["precip_mm_hr"])
     pr_mm_day.attrs["units"] = "mm/day"
     pr_mm_day.attrs["description"] = "IMERG monthly precipitation converted from mm/hr"
 
     out = pr_mm_day.to_dataset(name="precip_mm_day")
-    out.to_netcdf(IMERG_MM_DAY_FILE)
+    with plan.scheduler():
+        append_to_store(
+            out, IMERG_MM_DAY_FILE, domain_signature(), time_block=plan.chunks["time"]
+        )
 
     print("Saved:", IMERG_MM_DAY_FILE)
 
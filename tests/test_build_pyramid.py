@@ -0,0 +1,82 @@
+import numpy as np
+
+from src.build_pyramid import (
+    block_alignment,
+    build_levels,
+    coarsen_level,
+    level_grid,
+    native_grid,
+    overlap_matrix,
+)
+
+LAT = np.arange(20.05, 35.0, 0.1)
+LON = np.arange(68.05, 90.0, 0.1)
+
+
+def _area_mean(grid, data):
+    area = grid.cell_area()
+    valid = np.isfinite(data)
+    return np.nansum(data * area, axis=(1, 2)) / np.sum(np.where(valid, area, 0.0), axis=(1, 2))
+
+
+def test_level_edges_snap_to_resolution():
+    grid = level_grid(2.5, lat_bounds=(20.0, 35.0), lon_bounds=(68.0, 90.0))
+    assert grid.lat_edges[0] == 20.0 and grid.lat_edges[-1] == 35.0
+    assert grid.lon_edges[0] == 67.5 and grid.lon_edges[-1] == 90.0
+    assert grid.group == "res_2p5"
+
+
+def test_block_path_matches_overlap_matrices():
+    src = level_grid(0.5, lat_bounds=(20.0, 35.0), lon_bounds=(68.0, 90.0))
+    dst = level_grid(1.0, lat_bounds=(20.0, 35.0), lon_bounds=(68.0, 90.0))
+    assert block_alignment(src.lat_edges, dst.lat_edges) == (2, 0)
+
+    rng = np.random.default_rng(0)
+    data = rng.gamma(2.0, 2.0, size=(3, src.lat.size, src.lon.size))
+    data[0, 4, 7] = np.nan
+
+    wlat = overlap_matrix(np.sin(np.deg2rad(src.lat_edges)), np.sin(np.deg2rad(dst.lat_edges)))
+    wlon = overlap_matrix(src.lon_edges, dst.lon_edges)
+    valid = np.isfinite(data)
+    expected = (wlat @ np.where(valid, data, 0.0) @ wlon.T) / (wlat @ valid @ wlon.T)
+
+    mean, covered = coarsen_level(data, src, dst)
+    np.testing.assert_allclose(mean, expected)
+    np.testing.assert_allclose(covered, wlat @ valid @ wlon.T)
+
+
+def test_levels_conserve_area_mean():
+    native = native_grid(LAT, LON)
+    rng = np.random.default_rng(1)
+    data = rng.gamma(2.0, 2.0, size=(4, LAT.size, LON.size))
+
+    halves = [data[:2], data[2:]]
+    levels, outputs = build_levels(halves, native, resolutions=(1.0, 0.25, 2.5, 0.5))
+
+    assert [level.resolution for level in levels] == [0.25, 0.5, 1.0, 2.5]
+    expected = _area_mean(native, data)
+    for level, out in zip(levels, outputs):
+        assert out.shape == (4, level.lat.size, level.lon.size)
+        # Partially covered edge cells average only their covered part, so
+        # weight them by covered area to recover the native mean.
+        wlat = overlap_matrix(np.sin(np.deg2rad(native.lat_edges)), np.sin(np.deg2rad(level.lat_edges)))
+        wlon = overlap_matrix(native.lon_edges, level.lon_edges)
+        covered = np.outer(wlat.sum(axis=1), wlon.sum(axis=1))
+        mean = np.sum(out * covered, axis=(1, 2)) / covered.sum()
+        np.testing.assert_allclose(mean, expected, rtol=1e-10)
+
+
+def test_chained_levels_match_direct_coarsening_on_misaligned_box():
+    # Box edges (20.3-34.7, 68.3-89.7) fall inside cells of every level.
+    lat = np.arange(20.35, 34.7, 0.1)
+    lon = np.arange(68.35, 89.7, 0.1)
+    native = native_grid(lat, lon)
+    rng = np.random.default_rng(2)
+    data = rng.gamma(2.0, 2.0, size=(2, lat.size, lon.size))
+    data[1, :5, :5] = np.nan
+
+    levels, outputs = build_levels([data], native)
+
+    for level, out in zip(levels, outputs):
+        direct, _ = coarsen_level(data, native, level)
+        np.testing.assert_allclose(out, direct, rtol=1e-10)
@@ -0,0 +1,93 @@
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.catalogue import CatalogueSpec, build_url_list, cached_months, fetch_listing
+
+LISTINGS = {
+    "2019": [
+        "gpcp_v02r03_monthly_d201911_c20200101.nc",
+        "gpcp_v02r03_monthly_d201912_c20200101.nc",
+        "gpcp_v02r03_monthly_d201912_c20200301.nc",
+        "README.txt",
+    ],
+    "2020": [
+        "gpcp_v02r03_monthly_d202001_c20200401.nc",
+        "gpcp_v02r03_monthly_d202002_c20200401.nc",
+    ],
+}
+
+
+@pytest.fixture
+def listing_server(tmp_path):
+    root = tmp_path / "www"
+    for year, names in LISTINGS.items():
+        year_dir = root / year
+        year_dir.mkdir(parents=True)
+        links = "\n".join(f'<a href="{name}">{name}</a>' for name in names)
+        (year_dir / "index.html").write_text(
+            f"<html><body><a href='../'>Parent</a>\n{links}</body></html>"
+        )
+
+    statuses = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def log_request(self, code="-", size="-"):
+            statuses.append(int(code))
+
+    handler = functools.partial(Handler, directory=str(root))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/", statuses
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_build_url_list_filters_date_range(listing_server, tmp_path):
+    base_url, _ = listing_server
+    spec = CatalogueSpec(
+        base_url=base_url,
+        file_pattern=r"^gpcp_v02r03_monthly_d(?P<year>\d{4})(?P<month>\d{2})_c\d{8}\.nc$",
+    )
+
+    urls = build_url_list(
+        spec, "2019-12-01", "2020-01-01", cache_dir=tmp_path / "cache"
+    )
+
+    assert urls == [
+        f"{base_url}2019/gpcp_v02r03_monthly_d201912_c20200301.nc",
+        f"{base_url}2020/gpcp_v02r03_monthly_d202001_c20200401.nc",
+    ]
+
+
+def test_unchanged_listing_is_revalidated_with_304(listing_server, tmp_path):
+    base_url, statuses = listing_server
+    cache_dir = tmp_path / "cache"
+
+    first = fetch_listing(f"{base_url}2019/", cache_dir=cache_dir)
+    second = fetch_listing(f"{base_url}2019/", cache_dir=cache_dir)
+
+    assert first == second
+    assert statuses == [200, 304]
+
+
+def test_cached_months_use_cached_listings_only(listing_server, tmp_path):
+    base_url, statuses = listing_server
+    spec = CatalogueSpec(
+        base_url=base_url,
+        file_pattern=r"^gpcp_v02r03_monthly_d(?P<year>\d{4})(?P<month>\d{2})_c\d{8}\.nc$",
+    )
+    cache_dir = tmp_path / "cache"
+    build_url_list(spec, "2019-11-01", "2020-12-01", cache_dir=cache_dir)
+    requests_made = len(statuses)
+
+    months = cached_months(spec, "2019-12-01", "2020-12-01", cache_dir=cache_dir)
+
+    assert months == {"2019-12", "2020-01", "2020-02"}
+    assert cached_months(spec, "2019-12-01", "2021-01-01", cache_dir=cache_dir) is None
+    assert len(statuses) == requests_made
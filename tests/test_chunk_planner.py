@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+
+from src.chunk_planner import VariableHeader, plan_chunks
+
+HEADER = VariableHeader(
+    path=Path("imerg.HDF5"),
+    variable="precipitation",
+    dims=("time", "lon", "lat"),
+    shape=(1, 3600, 1800),
+    itemsize=4,
+    disk_chunks=(1, 145, 1800),
+)
+
+
+def test_plan_shrinks_time_then_space_within_budget():
+    plan = plan_chunks(
+        "test",
+        HEADER,
+        sizes={"time": 300, "lon": 3600, "lat": 1800},
+        budget_mb=64,
+        workers=2,
+    )
+
+    assert plan.chunks["time"] == 1
+    assert plan.chunks["lon"] < 3600
+    assert plan.chunks["lon"] % 145 == 0
+    assert plan.chunks["lat"] == 1800
+    assert plan.peak_bytes <= plan.budget_bytes
+
+
+def test_plan_fails_fast_with_estimate():
+    with pytest.raises(RuntimeError, match="MEMORY_BUDGET_MB"):
+        plan_chunks("test", HEADER, splittable=("time",), budget_mb=16, workers=4)
+
+
+def test_realistic_subset_does_not_snap_beyond_extent():
+    plan = plan_chunks(
+        "concatenate_imerg",
+        HEADER,
+        sizes={"time": 300, "lon": 220, "lat": 150},
+        workers=4,
+        budget_mb=4096,
+    )
+
+    assert plan.chunks == {"time": 300, "lon": 220, "lat": 150}
+    assert plan.peak_bytes <= plan.budget_bytes
+
+
+def test_snapped_chunks_are_checked_against_budget():
+    plan = plan_chunks(
+        "concatenate_imerg",
+        HEADER,
+        sizes={"time": 300, "lon": 220, "lat": 150},
+        budget_mb=64,
+        workers=4,
+    )
+
+    assert plan.chunks["time"] < 300
+    assert plan.peak_bytes <= plan.budget_bytes
+
+
+def test_subset_chunks_are_not_snapped_to_stored_chunks():
+    plan = plan_chunks(
+        "concatenate_imerg",
+        HEADER,
+        sizes={"time": 300, "lon": 220, "lat": 150},
+        splittable=("lon",),
+        budget_mb=8,
+        workers=1,
+    )
+
+    # Applied after selection, where stored chunk boundaries no longer line up.
+    assert plan.chunks["lon"] < 220
+    assert plan.chunks["lon"] % 145 != 0
+    assert plan.peak_bytes <= plan.budget_bytes
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from src.compute_metrics import compute_gridcell_metrics
+
+
+def _synthetic_pair(seed=0):
+    rng = np.random.default_rng(seed)
+    time = pd.date_range("2019-01-01", periods=30, freq="MS")
+    lat = np.array([21.25, 23.75, 26.25])
+    lon = np.array([68.75, 71.25])
+    obs = rng.gamma(2.0, 2.0, size=(time.size, lat.size, lon.size))
+    sim = 0.8 * obs + rng.normal(0.0, 0.5, size=obs.shape)
+    coords = {"time": time, "latitude": lat, "longitude": lon}
+    dims = ("time", "latitude", "longitude")
+    return xr.DataArray(sim, coords, dims), xr.DataArray(obs, coords, dims)
+
+
+def test_metrics_match_direct_computation():
+    sim, obs = _synthetic_pair()
+    metrics = compute_gridcell_metrics(sim, obs, time_block=7)
+
+    x = sim.values[:, 1, 0]
+    y = obs.values[:, 1, 0]
+    r = np.corrcoef(x, y)[0, 1]
+    alpha = x.std() / y.std()
+    beta = x.mean() / y.mean()
+    cell = metrics.isel(latitude=1, longitude=0)
+
+    assert np.isclose(cell["pearson_r"], r)
+    assert np.isclose(cell["bias_mm_day"], x.mean() - y.mean())
+    assert np.isclose(cell["rmse_mm_day"], np.sqrt(((x - y) ** 2).mean()))
+    assert np.isclose(
+        cell["kge"], 1 - np.sqrt((r - 1) ** 2 + (alpha - 1) ** 2 + (beta - 1) ** 2)
+    )
+    assert np.isclose(cell["wet_dry_agreement"], np.mean((x >= 1.0) == (y >= 1.0)))
+
+
+def test_metrics_skip_missing_months():
+    sim, obs = _synthetic_pair()
+    sim[:5, 0, 0] = np.nan
+    metrics = compute_gridcell_metrics(sim, obs)
+
+    assert int(metrics["n_months"][0, 0]) == sim.sizes["time"] - 5
+    x = sim.values[5:, 0, 0]
+    y = obs.values[5:, 0, 0]
+    assert np.isclose(metrics["pearson_r"][0, 0], np.corrcoef(x, y)[0, 1])
@@ -0,0 +1,53 @@
+from src.chunk_planner import MB
+from src.cost_estimate import (
+    HISTORY_RUNS,
+    StageEstimate,
+    format_report,
+    load_throughputs,
+    record_run,
+)
+
+
+def _estimate(stage, work_mb, **kwargs):
+    return StageEstimate(
+        stage=stage,
+        files=1,
+        read_bytes=int(work_mb * MB),
+        decompressed_bytes=0,
+        peak_bytes=0,
+        output_bytes=0,
+        **kwargs,
+    )
+
+
+def test_history_round_trip_gives_median_throughput(tmp_path):
+    history = tmp_path / "run_history.jsonl"
+    estimates = [_estimate("concatenate_imerg", 100), _estimate("extract_gpcp", 10)]
+
+    for seconds in (1.0, 4.0, 2.0):
+        record_run(estimates, {"concatenate_imerg": seconds}, history_file=history)
+
+    rates = load_throughputs(history)
+
+    assert set(rates) == {"concatenate_imerg"}
+    assert rates["concatenate_imerg"] == 50 * MB
+
+
+def test_only_recent_runs_calibrate(tmp_path):
+    history = tmp_path / "run_history.jsonl"
+    estimates = [_estimate("compute_metrics", 10)]
+
+    record_run(estimates, {"compute_metrics": 100.0}, history_file=history)
+    for _ in range(HISTORY_RUNS):
+        record_run(estimates, {"compute_metrics": 1.0}, history_file=history)
+    record_run(estimates, {"compute_metrics": 0.0}, history_file=history)
+
+    assert load_throughputs(history) == {"compute_metrics": 10 * MB}
+
+
+def test_report_flags_stages_over_budget():
+    report = format_report([_estimate("build_pyramid", 1, fits=False), _estimate("download_gpcp", 1)])
+
+    lines = report.splitlines()
+    assert lines[1].endswith("DOES NOT FIT MEMORY_BUDGET_MB")
+    assert "1 GPCP files" in lines[-1]
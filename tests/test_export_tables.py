@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+import src.export_tables as export
+
+
+def _series(values):
+    time = pd.date_range("2019-01-01", periods=len(values), freq="MS")
+    return xr.DataArray(np.asarray(values, dtype=float), coords={"time": time}, dims="time")
+
+
+def test_csv_tables_append_across_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "pyarrow", None)
+    series = {"box": (_series([2.0, 3.0]), _series([1.5, 3.5]))}
+
+    monkeypatch.setattr(export, "_RUN_ID", "run-a")
+    export.export_area_means(series, tables_dir=tmp_path)
+    monkeypatch.setattr(export, "_RUN_ID", "run-b")
+    export.export_area_means(series, tables_dir=tmp_path)
+
+    means = export.read_table("area_means", tables_dir=tmp_path)
+    assert list(means.columns) == export.AREA_MEAN_COLUMNS
+    assert means["run_id"].tolist() == ["run-a", "run-a", "run-b", "run-b"]
+    assert means["diff_mm_day"].tolist() == [0.5, -0.5, 0.5, -0.5]
+
+    runs = export.read_table("runs", tables_dir=tmp_path)
+    assert runs["n_months"].tolist() == [2, 2]
+    assert runs["time_end"].tolist() == ["2019-02-01", "2019-02-01"]
+
+
+def test_gridcell_metric_table_has_one_row_per_cell():
+    metrics = xr.Dataset(
+        {"pearson_r": (("latitude", "longitude"), np.arange(6.0).reshape(2, 3))},
+        coords={"latitude": [21.25, 23.75], "longitude": [68.75, 71.25, 73.75]},
+    )
+    table = export.gridcell_metric_table("run-a", metrics)
+
+    assert list(table.columns) == ["run_id", "latitude", "longitude", "pearson_r"]
+    assert len(table) == 6
+
+
+def test_csv_append_follows_existing_header(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "pyarrow", None)
+    export.append_table("t", pd.DataFrame({"run_id": ["a"], "x": [1], "y": [2]}), tables_dir=tmp_path)
+    export.append_table("t", pd.DataFrame({"y": [4], "run_id": ["b"], "x": [3]}), tables_dir=tmp_path)
+
+    table = export.read_table("t", tables_dir=tmp_path)
+    assert table.to_dict("list") == {"run_id": ["a", "b"], "x": [1, 3], "y": [2, 4]}
+
+    with pytest.raises(RuntimeError, match="Columns of 't' changed"):
+        export.append_table("t", pd.DataFrame({"run_id": ["c"], "x": [5]}), tables_dir=tmp_path)
+
+
+def test_parquet_tables_append_across_runs(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    series = {"box": (_series([2.0, 3.0]), _series([1.5, 3.5]))}
+
+    monkeypatch.setattr(export, "_RUN_ID", "run-a")
+    export.export_area_means(series, tables_dir=tmp_path)
+    monkeypatch.setattr(export, "_RUN_ID", "run-b")
+    export.export_area_means(series, tables_dir=tmp_path)
+
+    assert len(list((tmp_path / "area_means").glob("*.parquet"))) == 2
+    means = export.read_table("area_means", tables_dir=tmp_path)
+    assert list(means.columns) == export.AREA_MEAN_COLUMNS
+    assert sorted(means["run_id"].unique()) == ["run-a", "run-b"]
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import shapely
+import xarray as xr
+
+from src.region_mask import area_weights, masked_area_mean, region_mask
+
+
+def test_fractional_coverage_and_cache(tmp_path):
+    lat = np.array([21.25, 23.75])
+    lon = np.array([68.75, 71.25, 73.75])
+    # Covers the whole first column and the southern half of the second.
+    geom = shapely.box(67.5, 20.0, 70.0, 25.0).union(shapely.box(70.0, 20.0, 72.5, 21.25))
+
+    mask = region_mask(lat, lon, geom, cache_dir=tmp_path)
+
+    np.testing.assert_allclose(mask.values, [[1.0, 0.5, 0.0], [1.0, 0.0, 0.0]])
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+    xr.testing.assert_equal(region_mask(lat, lon, geom, cache_dir=tmp_path), mask)
+
+
+def test_masked_area_mean_is_weighted_dot_product(tmp_path):
+    lat = np.array([21.25, 33.75])
+    lon = np.array([68.75, 71.25])
+    geom = shapely.box(67.5, 20.0, 72.5, 35.0)
+    time = pd.date_range("2019-01-01", periods=3, freq="MS")
+    values = np.arange(12, dtype=float).reshape(3, 2, 2)
+    values[1, 0, 0] = np.nan
+    da = xr.DataArray(
+        values,
+        coords={"time": time, "latitude": lat, "longitude": lon},
+        dims=("time", "latitude", "longitude"),
+    )
+
+    weights = area_weights(region_mask(lat, lon, geom, cache_dir=tmp_path))
+    result = masked_area_mean(da, weights)
+
+    w = np.broadcast_to(np.cos(np.deg2rad(lat))[:, None], (2, 2))
+    for t in range(3):
+        valid = np.isfinite(values[t])
+        expected = (values[t][valid] * w[valid]).sum() / w[valid].sum()
+        assert np.isclose(result.values[t], expected)
+
+
+def test_country_mask_cache_hit_skips_geometry(tmp_path, monkeypatch):
+    import src.region_mask as rm
+
+    lat = np.array([21.25, 23.75])
+    lon = np.array([68.75, 71.25])
+    monkeypatch.setattr(rm, "country_geometry", lambda name: shapely.box(67.5, 20.0, 70.0, 25.0))
+    mask = rm.country_mask(lat, lon, "India", cache_dir=tmp_path)
+
+    def offline(name):
+        raise OSError("no network")
+
+    monkeypatch.setattr(rm, "country_geometry", offline)
+    xr.testing.assert_equal(rm.country_mask(lat, lon, "India", cache_dir=tmp_path), mask)
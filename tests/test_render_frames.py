@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+import src.render_frames as render
+
+
+def _field(values):
+    time = pd.date_range("2019-01-01", periods=values.shape[0], freq="MS")
+    return xr.DataArray(
+        values,
+        coords={"time": time, "latitude": [21.25, 23.75], "longitude": [68.75, 71.25, 73.75]},
+        dims=("time", "latitude", "longitude"),
+    )
+
+
+def test_frames_are_rendered_and_encoded(tmp_path, monkeypatch):
+    # Skip coastlines and borders: they need Natural Earth downloads.
+    monkeypatch.setattr(render, "_style_map_axis", lambda ax, geom: None)
+    rng = np.random.default_rng(0)
+    imerg = _field(rng.gamma(2.0, 2.0, size=(3, 2, 3)))
+    gpcp = _field(rng.gamma(2.0, 2.0, size=(3, 2, 3)))
+
+    frames = render.render_monthly_maps(
+        imerg, gpcp, None, kinds=("bias",), out_dir=tmp_path, workers=1, dpi=30
+    )
+
+    paths = frames["bias"]
+    assert [p.name for p in paths] == ["bias_2019-01.png", "bias_2019-02.png", "bias_2019-03.png"]
+    contents = [p.read_bytes() for p in paths]
+    assert len(set(contents)) == len(contents)
+
+    gif = render.encode_animation(paths, tmp_path / "bias.gif")
+    assert gif.read_bytes()[:6] == b"GIF89a"
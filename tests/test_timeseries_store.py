@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from src.timeseries_store import append_to_store, pending_months, plan_update, select_months
+
+
+def _monthly(start, periods):
+    time = pd.date_range(start, periods=periods, freq="MS")
+    values = np.arange(periods * 6, dtype="float32").reshape(periods, 2, 3)
+    return xr.Dataset(
+        {"precip_mm_day": (("time", "latitude", "longitude"), values)},
+        coords={
+            "time": time,
+            "latitude": [21.25, 23.75],
+            "longitude": [68.75, 71.25, 73.75],
+        },
+    )
+
+
+def test_new_months_are_appended(tmp_path):
+    path = tmp_path / "store.nc"
+    full = _monthly("2019-01-01", 5)
+    months = ["2019-01", "2019-02", "2019-03", "2019-04", "2019-05"]
+
+    assert plan_update(path, months[:3], "sig") == months[:3]
+    append_to_store(select_months(full, months[:3]), path, "sig")
+
+    pending = plan_update(path, months, "sig")
+    assert pending == months[3:]
+    append_to_store(select_months(full, pending), path, "sig")
+
+    with xr.open_dataset(path) as stored:
+        xr.testing.assert_allclose(stored["precip_mm_day"], full["precip_mm_day"])
+    assert plan_update(path, months, "sig") == []
+
+
+def test_incompatible_store_is_rebuilt(tmp_path):
+    path = tmp_path / "store.nc"
+    append_to_store(_monthly("2019-03-01", 2), path, "sig")
+
+    assert plan_update(path, ["2019-03", "2019-04"], "other") == ["2019-03", "2019-04"]
+    assert not path.exists()
+
+    append_to_store(_monthly("2019-03-01", 2), path, "sig")
+    assert plan_update(path, ["2019-01", "2019-03", "2019-04"], "sig") == [
+        "2019-01",
+        "2019-03",
+        "2019-04",
+    ]
+
+
+def test_groups_are_appended_independently(tmp_path):
+    path = tmp_path / "store.nc"
+    full = _monthly("2019-01-01", 4)
+    months = ["2019-01", "2019-02", "2019-03", "2019-04"]
+
+    append_to_store(select_months(full, months[:2]), path, "sig", group="a")
+    append_to_store(select_months(full, months[:3]), path, "sig", group="b")
+    assert pending_months(path, months, "sig", "a") == (months[2:], False)
+    assert pending_months(path, months, "sig", "b") == (months[3:], False)
+    assert pending_months(path, months, "sig", "c") == (months, False)
+
+    append_to_store(select_months(full, months[2:]), path, "sig", group="a")
+    with xr.open_dataset(path, group="a") as stored:
+        xr.testing.assert_allclose(stored["precip_mm_day"], full["precip_mm_day"])